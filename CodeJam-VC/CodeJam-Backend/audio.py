@@ -0,0 +1,174 @@
+"""
+In-memory audio decoding for uploads.
+
+The upload is streamed in chunks into ffmpeg's stdin and the decoded 16 kHz mono PCM is read
+straight back into a float32 NumPy array, the same format whisper.load_audio produces, so
+nothing is written to the uploads folder. Decoding stops as soon as the audio runs past
+max_seconds, which also bounds the memory a single upload can use.
+
+PcmStream does the same for audio that is still being recorded: encoded chunks are fed to a
+long-running ffmpeg as they arrive and the PCM decoded so far can be read at any time.
+"""
+import asyncio
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2  # mono 16-bit PCM
+
+
+class AudioDecodeError(Exception):
+    """Raised when ffmpeg cannot decode the uploaded audio"""
+
+
+class AudioTooLong(Exception):
+    """Raised when the decoded audio is longer than the allowed duration"""
+
+
+async def _feed(upload, stdin, chunk_size):
+    """Copy the upload into ffmpeg's stdin chunk by chunk"""
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            stdin.write(chunk)
+            await stdin.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # ffmpeg stopped reading: it failed, or we killed it for being too long
+    finally:
+        stdin.close()
+
+
+async def _read_pcm(process, max_bytes, chunk_size):
+    """Collect ffmpeg's PCM output, killing it once the output passes max_bytes"""
+    pcm = bytearray()
+    while True:
+        chunk = await process.stdout.read(chunk_size)
+        if not chunk:
+            return pcm
+        pcm += chunk
+        if len(pcm) > max_bytes:
+            process.kill()
+            raise AudioTooLong(f"Audio is longer than {max_bytes // BYTES_PER_SECOND} seconds")
+
+
+async def _start_ffmpeg():
+    """Start an ffmpeg that decodes whatever arrives on stdin to 16 kHz mono PCM on stdout"""
+    return await asyncio.create_subprocess_exec(
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+
+def pcm_to_float(pcm):
+    """Convert 16-bit PCM bytes to the float32 waveform Whisper expects"""
+    return np.frombuffer(pcm, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+async def decode_upload(upload, max_seconds=300, chunk_size=64 * 1024):
+    """
+    Decode an UploadFile (or anything with an async read(size)) to a float32 waveform at 16 kHz.
+
+    Raises AudioTooLong past max_seconds of audio and AudioDecodeError if ffmpeg fails.
+    """
+    process = await _start_ffmpeg()
+
+    feeder = asyncio.ensure_future(_feed(upload, process.stdin, chunk_size))
+    errors = asyncio.ensure_future(process.stderr.read())
+    try:
+        pcm = await _read_pcm(process, int(max_seconds * BYTES_PER_SECOND), chunk_size)
+        await feeder
+        stderr = await errors
+        await process.wait()
+    finally:
+        feeder.cancel()
+        errors.cancel()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    if process.returncode != 0:
+        raise AudioDecodeError(f"Failed to decode audio: {stderr.decode(errors='replace').strip()}")
+
+    return pcm_to_float(pcm)
+
+
+class PcmStream:
+    """
+    Decode an encoded audio stream (e.g. MediaRecorder webm chunks) while it is still arriving.
+
+    Chunks go in with write(); the PCM decoded so far is available at any time from samples().
+    """
+
+    def __init__(self, max_seconds=300, chunk_size=64 * 1024):
+        self.max_bytes = int(max_seconds * BYTES_PER_SECOND)
+        self.chunk_size = chunk_size
+        self._pcm = bytearray()
+        self._process = None
+        self._reader = None
+        self._errors = None
+
+    async def start(self):
+        self._process = await _start_ffmpeg()
+        self._reader = asyncio.ensure_future(self._read())
+        self._errors = asyncio.ensure_future(self._process.stderr.read())
+
+    async def _read(self):
+        while True:
+            chunk = await self._process.stdout.read(self.chunk_size)
+            if not chunk:
+                return
+            self._pcm += chunk
+            if len(self._pcm) > self.max_bytes:
+                self._process.kill()
+                raise AudioTooLong(f"Audio is longer than {self.max_bytes // BYTES_PER_SECOND} seconds")
+
+    async def write(self, chunk):
+        """Feed the next encoded chunk; raises AudioTooLong once the stream has run too long"""
+        if self._reader.done():
+            self._reader.result()  # Re-raise AudioTooLong, if that is why decoding stopped
+            raise AudioDecodeError("ffmpeg stopped decoding the stream")
+        try:
+            self._process.stdin.write(chunk)
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg exited; finish() reports why
+
+    @property
+    def duration(self):
+        """Seconds of audio decoded so far"""
+        return len(self._pcm) / BYTES_PER_SECOND
+
+    def samples(self):
+        """Float32 copy of everything decoded so far"""
+        return pcm_to_float(bytes(self._pcm))
+
+    async def finish(self):
+        """Close the input, wait for ffmpeg to drain, and return the complete waveform"""
+        try:
+            self._process.stdin.close()
+            await self._reader
+            stderr = await self._errors
+            await self._process.wait()
+        finally:
+            await self.close()
+
+        if self._process.returncode != 0:
+            raise AudioDecodeError(f"Failed to decode audio: {stderr.decode(errors='replace').strip()}")
+        return self.samples()
+
+    async def close(self):
+        """Stop decoding without waiting for the rest of the stream"""
+        if self._process is None:
+            return
+        self._reader.cancel()
+        self._errors.cancel()
+        if self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
@@ -0,0 +1,56 @@
+"""
+Re-parse archived transcripts in bulk.
+
+Reads JSONL records with a "text" field (and an optional ISO-8601 "reference_date"),
+and writes each record back out as JSONL with an added "events" list. Records come
+out in the same order they went in.
+
+    python backfill.py transcripts.jsonl events.jsonl --workers 0
+    cat transcripts.jsonl | python backfill.py > events.jsonl
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from itertools import tee
+
+from main import parse_schedule_to_events_many
+
+
+def read_records(lines):
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def to_pair(record):
+    reference_date = record.get("reference_date")
+    if reference_date:
+        reference_date = datetime.fromisoformat(reference_date)
+    return record["text"], reference_date
+
+
+def backfill(input_file, output_file, workers=1, chunk_size=256):
+    records, pending = tee(read_records(input_file))
+    pairs = (to_pair(record) for record in pending)
+
+    for record, events in zip(records, parse_schedule_to_events_many(pairs, workers, chunk_size)):
+        record["events"] = [event.to_dict() for event in events]
+        output_file.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse JSONL transcripts into JSONL events")
+    parser.add_argument("input", nargs="?", default="-", help="input JSONL file, or - for stdin")
+    parser.add_argument("output", nargs="?", default="-", help="output JSONL file, or - for stdout")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; 1 parses in-process, 0 uses every core")
+    parser.add_argument("--chunk-size", type=int, default=256, help="transcripts sent to a worker at a time")
+    args = parser.parse_args()
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    with input_file, output_file:
+        backfill(input_file, output_file, args.workers or None, args.chunk_size)
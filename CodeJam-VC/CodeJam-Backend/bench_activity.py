@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for the stop-phrase stripping in extract_clean_activity_full.
+
+Compares the compiled stop-phrase engine in main.py (strip_stop_phrases) against the previous
+implementation (one re.sub per phrase and word, kept below for reference). Both run over the
+clauses of the bench_parser corpus, after the same cut_mentions step, and must produce
+identical activity strings for every one of them.
+
+Run from the CodeJam-Backend folder:
+    python bench_activity.py
+"""
+import re
+import timeit
+
+from bench_parser import REFERENCE_DATE, generate_corpus
+from main import (AnnotatedSentence, cut_mentions, extract_all_time_mentions, extract_detailed_date_info,
+                  extract_locations, split_clauses, strip_stop_phrases)
+
+
+def legacy_strip_stop_phrases(cleaned):
+    """The previous implementation: one re.sub per phrase and word"""
+    days_of_week = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+    months = ['january', 'february', 'march', 'april', 'may', 'june',
+              'july', 'august', 'september', 'october', 'november', 'december']
+    relative_dates = ['today', 'tomorrow', 'tmrw']
+    time_indicators = ['at', 'from', 'to', 'until', 'till', 'by', 'around', 'about', 'starting',
+                       'am', 'pm', 'a.m.', 'p.m.']
+    location_indicators = ['at', 'in', 'on', 'near', 'around', 'beside']
+    time_period_words = ['morning', 'afternoon', 'evening', 'night', 'tonight']
+    intro_phrases = ['i have', 'i need', 'i want', "let's", 'we have', 'there is', "there's",
+                     'schedule', 'plan', 'add', 'can you', 'please', 'could you', 'would you',
+                     'i am', 'i will', 'i am going to', 'going to']
+    common_words = ['a', 'an', 'the', 'my', 'your', 'our', 'their', 'some', 'any', 'am', 'will']
+
+    for phrase in intro_phrases:
+        cleaned = re.sub(r'\b' + phrase + r'\b', '', cleaned)
+
+    all_words_to_remove = (days_of_week + months + relative_dates +
+                           time_indicators + location_indicators + common_words +
+                           time_period_words)
+    for word in all_words_to_remove:
+        cleaned = re.sub(r'\b' + word + r'\b', '', cleaned)
+
+    cleaned = re.sub(r'[.,!?;]', '', cleaned)
+    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+
+    words = cleaned.split()
+    filtered_words = []
+    for word in words:
+        if len(word) > 1 and not word.replace('.', '').isdigit():
+            filtered_words.append(word)
+
+    activity = " ".join(filtered_words)
+    return activity if activity else "event"
+
+
+def prepare_inputs(sentences):
+    """
+    Run the stages before stop-phrase stripping once per clause, so only the stripping itself is timed.
+
+    Returns the text of every clause with its locations, offsets and times cut out.
+    """
+    inputs = []
+    for text in sentences:
+        for clause in split_clauses(text.lower()):
+            sentence = AnnotatedSentence(clause)
+            extract_detailed_date_info(sentence, REFERENCE_DATE)
+            extract_all_time_mentions(sentence)
+            extract_locations(sentence)
+            inputs.append(cut_mentions(sentence))
+    return inputs
+
+
+def time_per_clause(function, inputs, number=3, repeat=5):
+    """Best-of-`repeat` average time per clause in microseconds"""
+    best = min(timeit.repeat(lambda: [function(cleaned) for cleaned in inputs], number=number, repeat=repeat))
+    return best / (number * len(inputs)) * 1e6
+
+
+if __name__ == "__main__":
+    inputs = prepare_inputs(generate_corpus())
+
+    for cleaned in inputs:
+        legacy = legacy_strip_stop_phrases(cleaned)
+        current = strip_stop_phrases(cleaned)
+        if legacy != current:
+            raise SystemExit(f"Activity mismatch for {cleaned!r}: {legacy!r} != {current!r}")
+
+    legacy_us = time_per_clause(legacy_strip_stop_phrases, inputs)
+    current_us = time_per_clause(strip_stop_phrases, inputs)
+
+    print(f"clauses:    {len(inputs)} (outputs identical)")
+    print(f"legacy:     {legacy_us:8.2f} us/clause")
+    print(f"compiled:   {current_us:8.2f} us/clause")
+    print(f"speedup:    {legacy_us / current_us:8.2f}x")
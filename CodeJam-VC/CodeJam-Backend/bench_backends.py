@@ -0,0 +1,142 @@
+"""
+Latency, memory and accuracy of each transcription backend on local audio fixtures.
+
+A fixture folder holds recordings next to their reference transcripts with the same stem:
+    fixtures/gym_tomorrow.webm
+    fixtures/gym_tomorrow.txt
+Each backend runs in its own process, so its peak RSS is measured on its own. For every
+backend the report shows load time, mean and p95 latency per clip, the real-time factor
+(processing seconds per audio second), peak RSS and word error rate against the references.
+
+Run from the CodeJam-Backend folder:
+    python bench_backends.py fixtures/
+    python bench_backends.py fixtures/ --backends whisper faster-whisper --model base.en
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import resource
+import statistics
+import sys
+import time
+
+from audio import SAMPLE_RATE
+from transcription_backends import BACKENDS, load_backend
+
+AUDIO_EXTENSIONS = {".wav", ".webm", ".mp3", ".m4a", ".ogg", ".flac"}
+
+
+def load_fixtures(folder):
+    """(audio path, reference text) for every recording that has a matching .txt file"""
+    fixtures = []
+    for name in sorted(os.listdir(folder)):
+        stem, extension = os.path.splitext(name)
+        reference = os.path.join(folder, stem + ".txt")
+        if extension.lower() in AUDIO_EXTENSIONS and os.path.exists(reference):
+            with open(reference, encoding="utf-8") as f:
+                fixtures.append((os.path.join(folder, name), f.read()))
+    return fixtures
+
+
+def normalize_words(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance between two texts, and the reference length"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(name, model_name, fixtures, repeat):
+    """Benchmark one backend; meant to run in a fresh process"""
+    import whisper
+
+    clips = [(whisper.load_audio(path), reference) for path, reference in fixtures]
+
+    start = time.perf_counter()
+    backend = load_backend(name, model_name)
+    load_seconds = time.perf_counter() - start
+    # First call pays for kernel setup; keep it out of the latencies
+    backend.transcribe(clips[0][0])
+
+    latencies = []
+    errors = words = 0
+    for _ in range(repeat):
+        for audio, reference in clips:
+            start = time.perf_counter()
+            result = backend.transcribe(audio)
+            latencies.append(time.perf_counter() - start)
+            clip_errors, clip_words = word_errors(reference, result["text"])
+            errors += clip_errors
+            words += clip_words
+
+    audio_seconds = sum(len(audio) for audio, _ in clips) * repeat / SAMPLE_RATE
+    latencies.sort()
+    return {
+        "backend": name,
+        "load_s": load_seconds,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "rtf": sum(latencies) / audio_seconds,
+        "rss_mb": peak_rss_mb(),
+        "wer": errors / words if words else 0.0,
+    }
+
+
+def _child(connection, name, model_name, fixtures, repeat):
+    try:
+        connection.send(run_backend(name, model_name, fixtures, repeat))
+    except Exception as exc:
+        connection.send({"backend": name, "error": f"{type(exc).__name__}: {exc}"})
+    connection.close()
+
+
+def run_isolated(name, model_name, fixtures, repeat):
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(child, name, model_name, fixtures, repeat))
+    process.start()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare transcription backends on local audio fixtures")
+    parser.add_argument("fixtures", help="folder of recordings with matching .txt reference transcripts")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--model", default="small.en")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the fixtures")
+    parser.add_argument("--json", action="store_true", help="print one JSON line per backend instead of a table")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"no recordings with matching .txt transcripts in {args.fixtures}")
+
+    print(f"{len(fixtures)} fixtures, model {args.model}")
+    for name in args.backends:
+        result = run_isolated(name, args.model, fixtures, args.repeat)
+        if args.json:
+            print(json.dumps(result))
+        elif "error" in result:
+            print(f"  {name:<15} failed: {result['error']}")
+        else:
+            print(f"  {name:<15} load {result['load_s']:6.1f} s  mean {result['mean_ms']:8.1f} ms  "
+                  f"p95 {result['p95_ms']:8.1f} ms  RTF {result['rtf']:.3f}  "
+                  f"RSS {result['rss_mb']:7.1f} MB  WER {result['wer']:6.1%}")
@@ -0,0 +1,61 @@
+"""
+Benchmark live-preview parsing of a long dictated agenda.
+
+Builds agendas from the bench_parser corpus, feeds each one to the parser a few words at a
+time the way /stream partials arrive, and compares re-parsing the whole transcript with
+parse_schedule_to_events against IncrementalParser.update. Every partial's events must be
+identical, so the check doubles as a regression test for the incremental parser.
+
+Run from the CodeJam-Backend folder:
+    python bench_incremental.py
+    python bench_incremental.py --sentences 60 --words-per-partial 2
+"""
+import argparse
+import random
+import sys
+import time
+
+import main
+from bench_parser import REFERENCE_DATE, event_record, generate_corpus
+from incremental_parser import IncrementalParser
+
+
+def partials(agenda, words_per_partial):
+    """Successive transcripts of the agenda, a few words longer each time"""
+    words = agenda.split(" ")
+    for end in range(words_per_partial, len(words) + words_per_partial, words_per_partial):
+        yield " ".join(words[:end])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full and incremental parsing of growing transcripts")
+    parser.add_argument("--agendas", type=int, default=20)
+    parser.add_argument("--sentences", type=int, default=30, help="corpus utterances per agenda")
+    parser.add_argument("--words-per-partial", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(2025)
+    corpus = generate_corpus()
+    agendas = [". ".join(rng.sample(corpus, args.sentences)) for _ in range(args.agendas)]
+
+    full_seconds = incremental_seconds = 0.0
+    updates = 0
+    for agenda in agendas:
+        incremental = IncrementalParser(REFERENCE_DATE)
+        for text in partials(agenda, args.words_per_partial):
+            start = time.perf_counter()
+            expected = main.parse_schedule_to_events(text, REFERENCE_DATE)
+            middle = time.perf_counter()
+            got = incremental.update(text)
+            end = time.perf_counter()
+
+            full_seconds += middle - start
+            incremental_seconds += end - middle
+            updates += 1
+            if [event_record(e) for e in got] != [event_record(e) for e in expected]:
+                sys.exit(f"IncrementalParser disagrees with parse_schedule_to_events for {text!r}")
+
+    print(f"{args.agendas} agendas of {args.sentences} utterances, {updates} partials")
+    print(f"  full re-parse  {full_seconds / updates * 1e3:8.3f} ms/partial")
+    print(f"  incremental    {incremental_seconds / updates * 1e3:8.3f} ms/partial  "
+          f"({full_seconds / incremental_seconds:.1f}x faster)")
@@ -0,0 +1,224 @@
+"""
+Benchmark and golden-output check for the schedule parser.
+
+Generates a deterministic corpus of realistic utterances (ranges, decimal times, word times,
+relative offsets, weekdays, dates, locations, several plans chained with "then"), parses all
+of them against a fixed reference date, and reports the time spent in each stage of
+parse_schedule_to_events. The parsed events are compared against golden_events.jsonl, so any
+performance change can be checked for identical results.
+
+Run from the CodeJam-Backend folder:
+    python bench_parser.py                  # benchmark + golden check
+    python bench_parser.py --update-golden  # after an intentional behaviour change
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import main
+
+REFERENCE_DATE = datetime(2025, 11, 16, 10, 30)
+CORPUS_SIZE = 2000
+MULTI_CLAUSE_SIZE = 300
+CORPUS_SEED = 2025
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_events.jsonl")
+
+INTROS = ["", "", "", "i have ", "i need to ", "please schedule ", "let's ", "can you add ", "i am going to ",
+          "remind me about ", "we have "]
+ACTIVITIES = ["gym", "standup", "dinner with alex", "team meeting", "dentist appointment", "call mom",
+              "lunch", "study session", "yoga class", "coffee with sam", "project review", "haircut",
+              "soccer practice", "piano lesson", "doctor visit", "grocery shopping", "date night",
+              "flight to toronto", "code review", "book club"]
+LOCATIONS = ["", "", "", "at joe's", "at the gym", "in room 101", "near the park", "at starbucks",
+             "on campus", "at the library", "in building 4", "around downtown", "beside the lake"]
+DATES = ["", "", "today", "tomorrow", "tmrw", "on monday", "on tuesday", "on wednesday", "on thursday",
+         "on friday", "on saturday", "on sunday", "24 november", "november 24", "on 3 march",
+         "december 1", "in 2 days", "in 3 weeks", "in 1 month"]
+SINGLE_TIMES = ["at 7", "at 9.30", "at 5:45", "at 8 pm", "at 7 am", "at 2.00 p.m.", "at 11.45 a.m.",
+                "at 3 o'clock", "by 6", "at noon", "at midnight", "at seven", "at eleven", "at 12",
+                "at 10am", "at 6pm"]
+RANGES = ["from 2 to 4", "from 5.30 to 6.30", "between 9 am and 10 am", "from 2.00 p.m. to 4.00 p.m.",
+          "from 7 until 9", "from 1 - 3", "from 10 am to 11 am", "between 6 - 8"]
+RELATIVE_TIMES = ["in 30 minutes", "in 1 hour", "in 2 hours", "in 15 mins", "in 3 hrs"]
+PERIODS = ["", "", "", "in the morning", "in the afternoon", "in the evening", "tonight", "at night",
+           "this morning"]
+CLAUSE_SEPARATORS = [" then ", " and then ", ", then ", "; ", " after that ", ". after that, "]
+
+# Utterances that once parsed wrong, checked after the generated corpus
+REGRESSIONS = [
+    "at 9 in the morning and at 3 in the afternoon",
+    "call at 10 this morning and at 4 this afternoon",
+    "gym at 7 then.",
+    "dinner at 8 and then?",
+    "meeting at the library 24 november at 3 and at 5 at the park",
+]
+
+
+def generate_utterance(rng):
+    """Build one utterance from a random mix of activity, date, time(s), period and location"""
+    kind = rng.random()
+    if kind < 0.15:
+        times = [rng.choice(RELATIVE_TIMES)]
+    elif kind < 0.40:
+        times = [rng.choice(RANGES)]
+    elif kind < 0.50:
+        times = [rng.choice(SINGLE_TIMES), "and", rng.choice(SINGLE_TIMES)]
+    elif kind < 0.55:
+        times = []
+    else:
+        times = [rng.choice(SINGLE_TIMES)]
+
+    parts = [rng.choice(DATES), *times, rng.choice(PERIODS)]
+    if rng.random() < 0.3:
+        rng.shuffle(parts)
+    location = rng.choice(LOCATIONS)
+    if rng.random() < 0.5:
+        parts.insert(0, location)
+    else:
+        parts.append(location)
+
+    sentence = rng.choice(INTROS) + rng.choice(ACTIVITIES) + " " + " ".join(p for p in parts if p)
+    return sentence.strip()
+
+
+def generate_multi_clause_utterance(rng):
+    """Two to four utterances joined the way people chain plans out loud"""
+    clauses = [generate_utterance(rng) for _ in range(rng.randint(2, 4))]
+    sentence = clauses[0]
+    for clause in clauses[1:]:
+        sentence += rng.choice(CLAUSE_SEPARATORS) + clause
+    return sentence
+
+
+def generate_corpus(size=CORPUS_SIZE, seed=CORPUS_SEED):
+    rng = random.Random(seed)
+    corpus = [generate_utterance(rng) for _ in range(size)]
+    # Drawn from their own generator, so the single-clause utterances stay the same
+    rng = random.Random(seed + 1)
+    corpus.extend(generate_multi_clause_utterance(rng) for _ in range(MULTI_CLAUSE_SIZE))
+    corpus.extend(REGRESSIONS)
+    return corpus
+
+
+def event_record(event):
+    """Compact, stable form of an event for the golden file"""
+    return [
+        event.activity,
+        event.location,
+        event.start.isoformat(timespec="minutes") if event.start else None,
+        event.end.isoformat(timespec="minutes") if event.end else None,
+    ]
+
+
+STAGES = ["date", "time_mentions", "locations", "activity", "events"]
+
+
+def timed_parse(sentence, reference_date, totals):
+    """Run the parse_schedule_to_events pipeline stage by stage, adding each stage's time to totals"""
+    clock = time.perf_counter
+    clauses = [main.AnnotatedSentence(clause) for clause in main.split_clauses(sentence.lower())]
+
+    start = clock()
+    clause_dates = main.resolve_clause_dates(clauses, reference_date)
+    totals["date"] += clock() - start
+
+    events = []
+    for clause, date_info in zip(clauses, clause_dates):
+        start = clock()
+        main.extract_all_time_mentions(clause)
+        after_times = clock()
+        main.extract_locations(clause)
+        after_locations = clock()
+        activity = main.extract_clean_activity_full(clause)
+        after_activity = clock()
+        clause_events = main.handle_relative_times(clause, activity, date_info, reference_date)
+        if not clause_events:
+            clause_events = main.create_events_with_datetime(clause, date_info, activity, reference_date)
+        end = clock()
+
+        totals["time_mentions"] += after_times - start
+        totals["locations"] += after_locations - after_times
+        totals["activity"] += after_activity - after_locations
+        totals["events"] += end - after_activity
+        events.extend(clause_events)
+    return events
+
+
+def run_benchmark(corpus, repeat):
+    totals = dict.fromkeys(STAGES, 0.0)
+    for _ in range(repeat):
+        for sentence in corpus:
+            timed_parse(sentence, REFERENCE_DATE, totals)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for sentence in corpus:
+            main.parse_schedule_to_events(sentence, REFERENCE_DATE)
+    end_to_end = time.perf_counter() - start
+
+    parses = len(corpus) * repeat
+    staged = sum(totals.values())
+    print(f"{len(corpus)} utterances x {repeat} runs")
+    for stage in STAGES:
+        print(f"  {stage:<14} {totals[stage] / parses * 1e6:8.2f} us/utterance  {totals[stage] / staged:6.1%}")
+    print(f"  {'end to end':<14} {end_to_end / parses * 1e6:8.2f} us/utterance  "
+          f"({parses / end_to_end:,.0f} utterances/s)")
+
+
+def golden_lines(corpus):
+    for sentence in corpus:
+        events = main.parse_schedule_to_events(sentence, REFERENCE_DATE)
+        yield json.dumps({"text": sentence, "events": [event_record(e) for e in events]})
+
+
+def check_golden(corpus):
+    """Compare the current parser output with the golden file; returns the number of mismatches"""
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        expected = f.read().splitlines()
+    actual = list(golden_lines(corpus))
+
+    if len(expected) != len(actual):
+        print(f"golden file has {len(expected)} utterances, corpus has {len(actual)}")
+        return max(len(expected), len(actual))
+
+    mismatches = 0
+    for want, got in zip(expected, actual):
+        if want != got:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  expected {want}\n  got      {got}")
+    print(f"golden check: {len(actual) - mismatches}/{len(actual)} identical")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the schedule parser and check it against golden output")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus when timing")
+    parser.add_argument("--update-golden", action="store_true", help="rewrite golden_events.jsonl from the parser")
+    parser.add_argument("--skip-bench", action="store_true", help="only run the golden check")
+    args = parser.parse_args()
+
+    corpus = generate_corpus()
+
+    # The staged pipeline must stay identical to parse_schedule_to_events, or the timings lie
+    for sentence in corpus:
+        staged = [event_record(e) for e in timed_parse(sentence, REFERENCE_DATE, dict.fromkeys(STAGES, 0.0))]
+        direct = [event_record(e) for e in main.parse_schedule_to_events(sentence, REFERENCE_DATE)]
+        if staged != direct:
+            sys.exit(f"bench_parser.timed_parse is out of sync with parse_schedule_to_events for {sentence!r}")
+
+    if args.update_golden:
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+            for line in golden_lines(corpus):
+                f.write(line + "\n")
+        print(f"wrote {len(corpus)} utterances to {GOLDEN_PATH}")
+        sys.exit(0)
+
+    if not args.skip_bench:
+        run_benchmark(corpus, args.repeat)
+
+    sys.exit(1 if check_golden(corpus) else 0)
@@ -0,0 +1,54 @@
+"""
+Throughput of batched Whisper decoding versus one clip at a time.
+
+Decodes the same set of clips with whisper_batcher.decode_batch at several batch sizes and
+reports clips per second for each, next to the unbatched model.transcribe baseline that
+/upload used before WHISPER_BATCH_WINDOW_MS existed.
+
+Run from the CodeJam-Backend folder with any short recordings (ffmpeg decodes them):
+    python bench_whisper_batch.py clip1.webm clip2.wav ...
+    python bench_whisper_batch.py --model base.en --batch-sizes 1 2 4 8 16 clips/*.wav
+"""
+import argparse
+import time
+
+import whisper
+
+from whisper_batcher import decode_batch
+
+
+def load_clips(paths, count):
+    """count clips of at most 30 seconds, cycling through the given files"""
+    audio = [whisper.load_audio(path)[:whisper.audio.N_SAMPLES] for path in paths]
+    return [audio[i % len(audio)] for i in range(count)]
+
+
+def clips_per_second(func, clips, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(clips), batch_size):
+        func(clips[i:i + batch_size])
+    return len(clips) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Whisper clips/sec across batch sizes")
+    parser.add_argument("audio", nargs="+", help="recordings to decode (cycled to fill the clip count)")
+    parser.add_argument("--model", default="small.en")
+    parser.add_argument("--clips", type=int, default=32, help="clips decoded per measurement")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    model = whisper.load_model(args.model)
+    language = "en" if args.model.endswith(".en") else None
+    fp16 = model.device.type == "cuda"
+    clips = load_clips(args.audio, args.clips)
+
+    # Warm up kernels and caches so the first measurement is not penalised
+    decode_batch(model, clips[:1], language=language)
+
+    baseline = clips_per_second(lambda batch: [model.transcribe(clip, fp16=fp16) for clip in batch], clips, 1)
+    print(f"{len(clips)} clips, model {args.model} on {model.device}")
+    print(f"  {'transcribe':<12} {baseline:8.2f} clips/s  1.00x")
+    for batch_size in args.batch_sizes:
+        rate = clips_per_second(lambda batch: decode_batch(model, batch, language=language), clips, batch_size)
+        print(f"  {'batch ' + str(batch_size):<12} {rate:8.2f} clips/s  {rate / baseline:.2f}x")
@@ -0,0 +1,126 @@
+"""
+Google Calendar service objects that are safe to use from several threads.
+
+A googleapiclient service sends every request through a single httplib2.Http, which is not
+thread-safe. A CalendarClientPool gives each thread its own service on its own keep-alive
+connection, all sharing one set of credentials:
+
+    - services are built from the discovery document bundled with google-api-python-client
+      (static_discovery=True), so building one never fetches anything
+    - the access token is refreshed refresh_margin seconds before it expires, by one thread
+      under a lock, so requests never go out with a token about to expire
+    - refreshed credentials are saved back to token_path, when given, for the next restart
+
+Point api_endpoint at a local stub server to test without Google, e.g.
+    from google.auth.credentials import AnonymousCredentials
+    clients = CalendarClientPool(AnonymousCredentials(), api_endpoint="http://127.0.0.1:8080/")
+"""
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from urllib.parse import urljoin
+
+import google_auth_httplib2
+import httplib2
+from googleapiclient.discovery import build
+from googleapiclient.http import BatchHttpRequest
+
+
+class CalendarClientPool:
+    def __init__(self, credentials, api_endpoint=None, token_path=None, refresh_margin=300, timeout=30):
+        """
+        credentials:    google.auth credentials shared by every thread's client
+        api_endpoint:   Calendar API base URL to send requests to instead of Google's; events are
+                        inserted at <api_endpoint>calendars/... and batches go to
+                        <api_endpoint>batch/calendar/v3
+        token_path:     authorized-user JSON file to save refreshed credentials to
+        refresh_margin: seconds before expiry at which the access token is refreshed
+        timeout:        socket timeout of each connection, in seconds
+        """
+        self.credentials = credentials
+        self.api_endpoint = api_endpoint
+        # The service builds its batch URL from the discovery document and ignores api_endpoint
+        self.batch_uri = urljoin(api_endpoint, "batch/calendar/v3") if api_endpoint else None
+        self.token_path = token_path
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.timeout = timeout
+        self.refreshes = 0
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+        self._clients_lock = threading.Lock()
+        self._https = []
+
+    @classmethod
+    def from_token_file(cls, path, scopes, **options):
+        """A pool using the authorized-user credentials in path (as written by quickstart.py), saving refreshes there"""
+        from google.oauth2.credentials import Credentials
+
+        return cls(Credentials.from_authorized_user_file(path, scopes), token_path=path, **options)
+
+    def service(self):
+        """This thread's calendar service, with credentials valid for at least refresh_margin more seconds"""
+        self.refresh_if_expiring()
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._local.service = self._build()
+        return service
+
+    def new_batch_http_request(self, service, callback=None):
+        """A batch request for service's calls, sent to api_endpoint when one is set"""
+        if self.batch_uri is None:
+            return service.new_batch_http_request(callback=callback)
+        return BatchHttpRequest(callback=callback, batch_uri=self.batch_uri)
+
+    def _build(self):
+        http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+        with self._clients_lock:
+            self._https.append(http)
+        client_options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+        return build("calendar", "v3", http=http, static_discovery=True, cache_discovery=False,
+                     client_options=client_options)
+
+    def _expiring(self):
+        credentials = self.credentials
+        if not credentials.valid:
+            return True
+        expiry = credentials.expiry
+        if expiry is None:
+            return False
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc)
+        if expiry.tzinfo is None:
+            now = now.replace(tzinfo=None)
+        return expiry - now < self.refresh_margin
+
+    def refresh_if_expiring(self):
+        """Refresh the shared credentials if they expire within refresh_margin"""
+        if not self._expiring():
+            return
+        with self._refresh_lock:
+            # Another thread may have refreshed them while this one waited
+            if not self._expiring():
+                return
+            self.credentials.refresh(google_auth_httplib2.Request(httplib2.Http(timeout=self.timeout)))
+            self.refreshes += 1
+            if self.token_path:
+                self._save_token()
+
+    def _save_token(self):
+        # Write a new file and swap it in, so a crash never leaves a half-written token behind
+        temporary = f"{self.token_path}.tmp"
+        with open(temporary, "w") as token_file:
+            token_file.write(self.credentials.to_json())
+        os.replace(temporary, self.token_path)
+
+    def stats(self):
+        with self._clients_lock:
+            clients = len(self._https)
+        return {"clients": clients, "refreshes": self.refreshes}
+
+    def close(self):
+        """Close every thread's connections"""
+        with self._clients_lock:
+            https, self._https = self._https, []
+        for http in https:
+            http.close()
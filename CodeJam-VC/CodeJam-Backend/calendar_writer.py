@@ -0,0 +1,190 @@
+"""
+Batched Google Calendar inserts.
+
+A CalendarWriter collects the event inserts of one request, and of other requests arriving
+within a short window, and sends them as a single Calendar API batch request, one HTTP round
+trip for up to max_batch events. Items that fail with a transient error are retried with
+exponential backoff in a later batch; the rest resolve with their htmlLink or their error.
+
+The writer takes its service from a CalendarClientPool, which can be pointed at a local stub
+server for testing (see calendar_client.py).
+"""
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from google.auth.exceptions import GoogleAuthError, TransportError
+from googleapiclient.errors import HttpError
+
+from metrics import span
+
+# Statuses worth retrying; 403 only counts when Google reports a rate limit
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = (b"rateLimitExceeded", b"userRateLimitExceeded")
+
+
+def is_retryable(exc):
+    """Whether a failed insert may succeed if sent again"""
+    if isinstance(exc, HttpError):
+        status = exc.resp.status
+        if status == 403:
+            content = exc.content or b""
+            return any(reason in content for reason in RATE_LIMIT_REASONS)
+        return status in RETRYABLE_STATUSES
+    if isinstance(exc, GoogleAuthError):
+        # A token refresh that could not reach the token server, or that it answered with a 5xx
+        return isinstance(exc, TransportError) or exc.retryable
+    # Connection resets, timeouts and other socket-level failures
+    return isinstance(exc, OSError)
+
+
+class _PendingInsert:
+    __slots__ = ('body', 'future', 'attempts', 'not_before')
+
+    def __init__(self, body):
+        self.body = body
+        self.future = Future()
+        self.attempts = 0
+        self.not_before = 0.0
+
+
+class CalendarWriter:
+    def __init__(self, clients, calendar_id="primary", window=0.02, max_batch=50, max_retries=4, backoff=0.5):
+        """
+        clients:     CalendarClientPool the writer thread takes its service from
+        window:      seconds to wait for more inserts before sending a batch
+        max_batch:   most inserts per batch request (Google recommends 50 or fewer)
+        max_retries: retries per insert after transient errors, spaced backoff * 2**attempt seconds apart
+        """
+        self.clients = clients
+        self.calendar_id = calendar_id
+        self.window = window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="calendar-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, body):
+        """Queue one event insert; the returned Future resolves to its htmlLink"""
+        item = _PendingInsert(body)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("CalendarWriter is closed")
+            self._pending.append(item)
+            self._condition.notify()
+        return item.future
+
+    def insert_many(self, bodies, timeout=None):
+        """
+        Insert events and return their htmlLinks in the same order.
+
+        Waits for every insert to finish, then raises the first error if any insert failed
+        for good (the other events are still created).
+        """
+        futures = [self.submit(body) for body in bodies]
+        links = []
+        error = None
+        for future in futures:
+            exc = future.exception(timeout)
+            if exc is not None:
+                error = error or exc
+                links.append(None)
+            else:
+                links.append(future.result())
+        if error is not None:
+            raise error
+        return links
+
+    def close(self):
+        """Send whatever is still queued, then stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_batch(self):
+        """Block until a batch is ready to send; None once closed and drained"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                ready = [item for item in self._pending if item.not_before <= now]
+                if ready:
+                    break
+                if not self._pending:
+                    if self._closed:
+                        return None
+                    self._condition.wait()
+                else:
+                    # Only retries waiting out their backoff are left
+                    self._condition.wait(min(item.not_before for item in self._pending) - now)
+
+            # Give other requests a moment to add to this batch; every submit() wakes this wait,
+            # so it runs against the deadline rather than for a fresh window each time
+            deadline = time.monotonic() + self.window
+            while len(ready) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+                now = time.monotonic()
+                ready = [item for item in self._pending if item.not_before <= now]
+
+            batch = ready[:self.max_batch]
+            taken = set(map(id, batch))
+            self._pending = [item for item in self._pending if id(item) not in taken]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._send(batch)
+            except Exception as exc:
+                # Callers block on these futures, so one bad batch must neither strand them nor stop the thread
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(exc)
+
+    def _send(self, batch):
+        results = {}
+
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+
+        try:
+            # Refreshes the access token first if it is about to expire, which can fail like the batch can
+            service = self.clients.service()
+            request = self.clients.new_batch_http_request(service, callback=callback)
+            for index, item in enumerate(batch):
+                request.add(service.events().insert(calendarId=self.calendar_id, body=item.body),
+                            request_id=str(index))
+            with span("calendar.batch"):
+                request.execute()
+        except Exception as exc:
+            # The batch itself failed; every item in it shares the error
+            results = {str(index): (None, exc) for index in range(len(batch))}
+
+        retries = []
+        for index, item in enumerate(batch):
+            response, exception = results.get(str(index), (None, RuntimeError("No response for batch item")))
+            if exception is None:
+                item.future.set_result(response.get("htmlLink"))
+            elif is_retryable(exception) and item.attempts < self.max_retries:
+                delay = self.backoff * 2 ** item.attempts
+                item.attempts += 1
+                item.not_before = time.monotonic() + delay * random.uniform(0.5, 1.0)
+                retries.append(item)
+            else:
+                item.future.set_exception(exception)
+
+        if retries:
+            with self._condition:
+                self._pending.extend(retries)
+                self._condition.notify()
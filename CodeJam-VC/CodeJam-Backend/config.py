@@ -0,0 +1,116 @@
+"""
+Runtime settings for the VoiceCal backend.
+
+Every setting can be overridden with an environment variable of the same name, e.g.
+    PARSE_CACHE_SIZE=0 uvicorn demo:app
+"""
+import os
+
+
+def _int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _float(name, default):
+    return float(os.environ.get(name, default))
+
+
+def _bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Parsed-transcript cache in front of parse_schedule_to_events (0 disables it)
+PARSE_CACHE_SIZE = _int("PARSE_CACHE_SIZE", 1024)
+# Seconds a cached parse stays valid (0 means no expiry)
+PARSE_CACHE_TTL = _float("PARSE_CACHE_TTL", 3600)
+# Processes parsing the clauses of long dictations in parallel (0 parses them in the request thread)
+PARSE_CLAUSE_WORKERS = _int("PARSE_CLAUSE_WORKERS", 0)
+# Parses that may wait for those processes at once before the endpoint answers 503
+PARSE_QUEUE_DEPTH = _int("PARSE_QUEUE_DEPTH", 32)
+
+# Whisper model served by /upload, how many replicas each worker keeps, and when they load
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "small.en")
+WHISPER_REPLICAS = _int("WHISPER_REPLICAS", 1)
+WHISPER_EAGER_LOAD = _bool("WHISPER_EAGER_LOAD", True)
+WHISPER_WARMUP = _bool("WHISPER_WARMUP", True)
+# Engine running the model: "whisper" (PyTorch) or "faster-whisper" (CTranslate2, needs faster-whisper).
+# faster-whisper runs with FASTER_WHISPER_COMPUTE_TYPE weights on FASTER_WHISPER_CPU_THREADS threads (0 = all).
+TRANSCRIBE_BACKEND = os.environ.get("TRANSCRIBE_BACKEND", "whisper").strip().lower()
+FASTER_WHISPER_COMPUTE_TYPE = os.environ.get("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+FASTER_WHISPER_CPU_THREADS = _int("FASTER_WHISPER_CPU_THREADS", 0)
+
+# Cross-request batching of /upload clips: wait up to this many milliseconds for up to this many
+# clips and decode them together (0 milliseconds disables batching; whisper backend only)
+WHISPER_BATCH_WINDOW_MS = _float("WHISPER_BATCH_WINDOW_MS", 0)
+WHISPER_BATCH_SIZE = _int("WHISPER_BATCH_SIZE", 8)
+WHISPER_BATCH_QUEUE_DEPTH = _int("WHISPER_BATCH_QUEUE_DEPTH", 32)
+
+# Threads running Whisper for /upload, and how many more uploads may wait for one before
+# the endpoint answers 503 (defaults to one thread per replica)
+TRANSCRIBE_WORKERS = _int("TRANSCRIBE_WORKERS", WHISPER_REPLICAS)
+TRANSCRIBE_QUEUE_DEPTH = _int("TRANSCRIBE_QUEUE_DEPTH", 8)
+# Threads waiting on Google Calendar writes, and how many more requests may wait for one.
+# Calendar clients are per thread (see calendar_client.py), so these can run concurrently.
+CALENDAR_WORKERS = _int("CALENDAR_WORKERS", 4)
+CALENDAR_QUEUE_DEPTH = _int("CALENDAR_QUEUE_DEPTH", 32)
+# Retry-After seconds sent with 503 responses when an executor is saturated
+BUSY_RETRY_AFTER = _int("BUSY_RETRY_AFTER", 2)
+
+# Calendar inserts arriving within this many milliseconds share one batch request
+CALENDAR_BATCH_WINDOW_MS = _float("CALENDAR_BATCH_WINDOW_MS", 20)
+CALENDAR_BATCH_SIZE = _int("CALENDAR_BATCH_SIZE", 50)
+# Retries per insert after rate limits and server errors, with exponential backoff from this many seconds
+CALENDAR_MAX_RETRIES = _int("CALENDAR_MAX_RETRIES", 4)
+CALENDAR_RETRY_BACKOFF = _float("CALENDAR_RETRY_BACKOFF", 0.5)
+# Authorized-user credentials (written by quickstart.py); refreshed tokens are saved back to it
+CALENDAR_TOKEN_PATH = os.environ.get("CALENDAR_TOKEN_PATH", "token.json")
+# The access token is refreshed this many seconds before it expires
+CALENDAR_REFRESH_MARGIN = _float("CALENDAR_REFRESH_MARGIN", 300)
+CALENDAR_HTTP_TIMEOUT = _float("CALENDAR_HTTP_TIMEOUT", 30)
+# Send Calendar API requests here instead of Google, e.g. a local stub server for testing
+CALENDAR_API_ENDPOINT = os.environ.get("CALENDAR_API_ENDPOINT", "")
+
+# Events matching one created within this many seconds reuse its htmlLink instead of being inserted
+# again (0 disables it); kept in memory, or in this SQLite file when set
+EVENT_DEDUP_WINDOW = _float("EVENT_DEDUP_WINDOW", 24 * 3600)
+EVENT_DEDUP_PATH = os.environ.get("EVENT_DEDUP_PATH", "")
+
+# Longest upload /upload will decode, in seconds, and the chunk size used to stream it into ffmpeg
+MAX_AUDIO_SECONDS = _float("MAX_AUDIO_SECONDS", 300)
+AUDIO_CHUNK_BYTES = _int("AUDIO_CHUNK_BYTES", 64 * 1024)
+
+# /stream re-transcribes after this many seconds of new audio, using Whisper's 30 second window
+STREAM_STEP_SECONDS = _float("STREAM_STEP_SECONDS", 1.0)
+STREAM_WINDOW_SECONDS = _float("STREAM_WINDOW_SECONDS", 30)
+
+# Record per-stage timings for /metrics and log one JSON timing line per request
+TRACING_ENABLED = _bool("TRACING_ENABLED", False)
+
+# SQLite file caching Whisper results by upload SHA-256 and model (empty disables it), and its size cap
+TRANSCRIPT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", "transcripts.sqlite3")
+TRANSCRIPT_CACHE_MAX_MB = _float("TRANSCRIPT_CACHE_MAX_MB", 256)
+
+# Silence trimming before Whisper on /upload: "energy" (built in), "webrtc" (needs webrtcvad) or "off".
+# Speech keeps VAD_PADDING_MS on each side and pauses are shortened to VAD_MAX_PAUSE_MS.
+VAD_MODE = os.environ.get("VAD_MODE", "energy").strip().lower()
+VAD_THRESHOLD_DB = _float("VAD_THRESHOLD_DB", -45.0)
+VAD_AGGRESSIVENESS = _int("VAD_AGGRESSIVENESS", 2)
+VAD_PADDING_MS = _int("VAD_PADDING_MS", 200)
+VAD_MAX_PAUSE_MS = _int("VAD_MAX_PAUSE_MS", 500)
+
+# /upload answers with the full result ("sync") or queues a job and answers 202 with its id ("async");
+# clients can also pick per request with ?mode=async
+UPLOAD_MODE = os.environ.get("UPLOAD_MODE", "sync").strip().lower()
+# Where jobs wait: "memory" (this process) or "redis" (JOB_REDIS_URL, needs the redis package)
+JOB_STORE = os.environ.get("JOB_STORE", "memory").strip().lower()
+JOB_REDIS_URL = os.environ.get("JOB_REDIS_URL", "redis://localhost:6379/0")
+# Background workers per process, queued jobs before /upload answers 503, and seconds results are kept
+JOB_WORKERS = _int("JOB_WORKERS", TRANSCRIBE_WORKERS)
+JOB_QUEUE_DEPTH = _int("JOB_QUEUE_DEPTH", 64)
+JOB_TTL = _float("JOB_TTL", 3600)
+# Largest upload accepted as a job, and how often /jobs/{id}/events checks for progress
+JOB_MAX_UPLOAD_BYTES = _int("JOB_MAX_UPLOAD_BYTES", 50 * 1024 * 1024)
+JOB_POLL_SECONDS = _float("JOB_POLL_SECONDS", 0.5)
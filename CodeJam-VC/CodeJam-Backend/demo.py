@@ -1,15 +1,35 @@
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi import FastAPI, UploadFile, File, Request, WebSocket
+from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import whisper
-import os
+import asyncio
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
 
-from main import parse_schedule_to_events, json_to_google_event
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from audio import AudioDecodeError, AudioTooLong, decode_upload
+from calendar_client import CalendarClientPool
+from calendar_writer import CalendarWriter
+import config
+from event_index import DedupInserter, MemoryEventIndex, SQLiteEventIndex
+from executors import BoundedExecutor, ExecutorSaturated
+from incremental_parser import IncrementalParser
+from jobs import FINISHED, JobRunner, MemoryJobStore, RedisJobStore
+from metrics import enable as enable_tracing, render as render_metrics, request_trace, span
+from model_pool import ModelPool
+from parse_cache import ParseCache
+from streaming import StreamingTranscriber
+from transcript_cache import TranscriptCache, upload_digest
+from vad import trim_silence
 
 app = FastAPI()
 
+# Per-stage timing spans, /metrics histograms and per-request timing logs
+enable_tracing(config.TRACING_ENABLED)
+if config.TRACING_ENABLED:
+    timing_log = logging.getLogger("voicecal.timing")
+    timing_log.setLevel(logging.INFO)
+    timing_log.addHandler(logging.StreamHandler())
+
 # Serve static files
 app.mount("/static", StaticFiles(directory="/CodeJam-VC/CodeJam-Frontend"), name="static")
 
@@ -18,48 +38,341 @@ app.mount("/static", StaticFiles(directory="/CodeJam-VC/CodeJam-Frontend"), name
 def home():
     return RedirectResponse("/static/HomePage.html")
 
-# Load Whisper model
-model = whisper.load_model("small.en")
+# Transcription model replicas for this worker (TRANSCRIBE_BACKEND picks the engine);
+# eager pools load and warm up at startup
+backend_options = {}
+if config.TRANSCRIBE_BACKEND == "faster-whisper":
+    backend_options = {"compute_type": config.FASTER_WHISPER_COMPUTE_TYPE,
+                       "cpu_threads": config.FASTER_WHISPER_CPU_THREADS}
+model_pool = ModelPool(
+    config.WHISPER_MODEL,
+    replicas=config.WHISPER_REPLICAS,
+    eager=config.WHISPER_EAGER_LOAD,
+    warmup=config.WHISPER_WARMUP,
+    backend=config.TRANSCRIBE_BACKEND,
+    backend_options=backend_options
+)
+
+@app.on_event("startup")
+def load_models():
+    model_pool.start()
+
+# Concurrent uploads are decoded together in batches when a batch window is configured
+whisper_batcher = None
+if config.WHISPER_BATCH_WINDOW_MS > 0:
+    # Imported here so faster-whisper deployments do not need PyTorch installed
+    from whisper_batcher import WhisperBatcher
+    whisper_batcher = WhisperBatcher(
+        model_pool,
+        window=config.WHISPER_BATCH_WINDOW_MS / 1000,
+        max_batch=config.WHISPER_BATCH_SIZE,
+        max_queue=config.WHISPER_BATCH_QUEUE_DEPTH
+    )
 
-# Google Calendar setup
+# Google Calendar setup: a client per thread, with the token refreshed before it expires
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
-creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-service = build("calendar", "v3", credentials=creds)
+calendar_clients = CalendarClientPool.from_token_file(
+    config.CALENDAR_TOKEN_PATH,
+    SCOPES,
+    api_endpoint=config.CALENDAR_API_ENDPOINT or None,
+    refresh_margin=config.CALENDAR_REFRESH_MARGIN,
+    timeout=config.CALENDAR_HTTP_TIMEOUT
+)
 
-# Upload endpoint
-@app.post("/upload")
-async def upload_audio(file: UploadFile = File(...)):
-    # Ensure uploads folder exists
-    os.makedirs("uploads", exist_ok=True)
-    file_path = f"uploads/{file.filename}"
+# Retried uploads of the same clip skip Whisper
+transcript_cache = None
+if config.TRANSCRIPT_CACHE_PATH:
+    transcript_cache = TranscriptCache(config.TRANSCRIPT_CACHE_PATH,
+                                       max_bytes=int(config.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024))
+
+# Long dictations can have their clauses parsed on several cores
+clause_executor = None
+if config.PARSE_CLAUSE_WORKERS > 0:
+    clause_executor = ProcessPoolExecutor(max_workers=config.PARSE_CLAUSE_WORKERS)
+
+# Repeated phrases ("gym tomorrow at 7") skip the parser
+parse_cache = ParseCache(maxsize=config.PARSE_CACHE_SIZE, ttl=config.PARSE_CACHE_TTL, executor=clause_executor)
+
+# Recently created events, so retries and repeated utterances do not insert them again
+event_index = None
+if config.EVENT_DEDUP_WINDOW > 0:
+    if config.EVENT_DEDUP_PATH:
+        event_index = SQLiteEventIndex(config.EVENT_DEDUP_PATH, window=config.EVENT_DEDUP_WINDOW)
+    else:
+        event_index = MemoryEventIndex(window=config.EVENT_DEDUP_WINDOW)
+
+# Inserts from concurrent requests are sent together as Calendar batch requests
+calendar_writer = CalendarWriter(
+    calendar_clients,
+    window=config.CALENDAR_BATCH_WINDOW_MS / 1000,
+    max_batch=config.CALENDAR_BATCH_SIZE,
+    max_retries=config.CALENDAR_MAX_RETRIES,
+    backoff=config.CALENDAR_RETRY_BACKOFF
+)
+# Duplicate events, including ones whose first insert is still in flight, reuse its htmlLink
+event_inserter = None
+if event_index is not None:
+    event_inserter = DedupInserter(event_index, calendar_writer.submit)
+
+# Blocking Whisper and Calendar calls run on bounded thread pools, off the event loop
+transcribe_executor = BoundedExecutor("transcribe", config.TRANSCRIBE_WORKERS, config.TRANSCRIBE_QUEUE_DEPTH)
+calendar_executor = BoundedExecutor("calendar", config.CALENDAR_WORKERS, config.CALENDAR_QUEUE_DEPTH)
+# Parses only leave the event loop when they wait on the clause processes
+parse_executor = None
+if clause_executor is not None:
+    parse_executor = BoundedExecutor("parse", config.PARSE_CLAUSE_WORKERS, config.PARSE_QUEUE_DEPTH)
+
+# Queued /upload jobs, processed by background workers in this process
+if config.JOB_STORE == "redis":
+    job_store = RedisJobStore(config.JOB_REDIS_URL, max_queue=config.JOB_QUEUE_DEPTH, ttl=config.JOB_TTL)
+else:
+    job_store = MemoryJobStore(max_queue=config.JOB_QUEUE_DEPTH, ttl=config.JOB_TTL)
+job_runner = None
+
+@app.on_event("startup")
+async def start_job_workers():
+    global job_runner
+    job_runner = JobRunner(job_store, run_upload_job, workers=config.JOB_WORKERS,
+                           busy_retry_after=config.BUSY_RETRY_AFTER)
+    job_runner.start()
 
-    # Save audio file
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_runner.stop()
 
-    # Transcribe audio
-    result = model.transcribe(file_path)
-    transcription = result["text"]
+@app.on_event("shutdown")
+def stop_executors():
+    transcribe_executor.shutdown()
+    calendar_executor.shutdown()
+    if parse_executor is not None:
+        parse_executor.shutdown()
+    calendar_writer.close()
+    calendar_clients.close()
+    if clause_executor is not None:
+        clause_executor.shutdown()
+    if whisper_batcher is not None:
+        whisper_batcher.close()
+    if transcript_cache is not None:
+        transcript_cache.close()
+    if event_index is not None:
+        event_index.close()
+
+# Answer right away with 503 when a pool is full, instead of letting requests pile up
+@app.exception_handler(ExecutorSaturated)
+def busy(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(config.BUSY_RETRY_AFTER)}
+    )
+
+# Audio that is too long or cannot be decoded is the client's problem, not a server error
+@app.exception_handler(AudioTooLong)
+def audio_too_long(request: Request, exc: AudioTooLong):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+@app.exception_handler(AudioDecodeError)
+def audio_not_decodable(request: Request, exc: AudioDecodeError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+def trim_audio(audio):
+    """Drop silence before Whisper sees it; returns the audio and how much was trimmed"""
+    return trim_silence(
+        audio,
+        mode=config.VAD_MODE,
+        threshold_db=config.VAD_THRESHOLD_DB,
+        aggressiveness=config.VAD_AGGRESSIVENESS,
+        padding_ms=config.VAD_PADDING_MS,
+        max_pause_ms=config.VAD_MAX_PAUSE_MS
+    )
+
+def run_whisper(audio):
+    with span("whisper.inference"):
+        return model_pool.transcribe(audio)
+
+async def transcribe_audio(audio):
+    """Transcribe a waveform on the bounded Whisper pool"""
+    with span("transcribe"):
+        return await transcribe_executor.run(run_whisper, audio)
+
+async def transcribe_clip(audio):
+    """Transcribe a whole uploaded clip, batched with other uploads when batching is on"""
+    if whisper_batcher is None:
+        return await transcribe_audio(audio)
+    with span("transcribe"):
+        return await asyncio.wrap_future(whisper_batcher.submit(audio))
+
+def insert_events(event_dicts, google_events):
+    """Insert events that were not created recently and return (htmlLinks, duplicate flags), in order"""
+    if event_inserter is None:
+        return calendar_writer.insert_many(google_events), [False] * len(google_events)
+    return event_inserter.insert_many(event_dicts, google_events)
+
+async def schedule_transcription(transcription):
+    """Parse a transcript into events and add them to Google Calendar"""
+    # The parser would make a default 9-10 AM event out of nothing, so silence schedules nothing
+    if not transcription.strip():
+        return {"text": transcription, "events": [], "google_events": [], "calendar_links": [], "duplicates": []}
 
     # Parse transcription to events
-    events = parse_schedule_to_events(transcription)
+    with span("parse"):
+        if parse_executor is None:
+            events = parse_cache.parse(transcription)
+        else:
+            # Waiting on the clause processes would block every other request on the event loop
+            events = await parse_executor.run(parse_cache.parse, transcription)
     event_dicts = [e.to_dict() for e in events]
 
     # Convert to Google Calendar event format
-    google_events = [json_to_google_event(e) for e in event_dicts]
+    google_events = [e.to_google_event() for e in events]
 
     # Insert events into Google Calendar
-    inserted_links = []
-    for g_event in google_events:
-        created = service.events().insert(
-            calendarId="primary",
-            body=g_event
-        ).execute()
-        inserted_links.append(created.get("htmlLink"))
+    with span("calendar"):
+        inserted_links, duplicates = await calendar_executor.run(insert_events, event_dicts, google_events)
 
     return {
         "text": transcription,
         "events": event_dicts,
         "google_events": google_events,
-        "calendar_links": inserted_links
+        "calendar_links": inserted_links,
+        "duplicates": duplicates
     }
+
+async def process_upload(file):
+    """Decode, transcribe, parse and schedule one uploaded recording; returns the /upload response"""
+    loop = asyncio.get_running_loop()
+    # A retried upload of the same clip reuses the earlier transcription
+    result = None
+    # Engines and trimmed or untrimmed audio can transcribe differently, so both are part of the key
+    transcript_model = f"{config.TRANSCRIBE_BACKEND}:{config.WHISPER_MODEL}+vad:{config.VAD_MODE}"
+    if transcript_cache is not None:
+        with span("transcript_cache"):
+            digest = await upload_digest(file, chunk_size=config.AUDIO_CHUNK_BYTES)
+            # SQLite reads and writes block, so they run on a thread like any other blocking call
+            result = await loop.run_in_executor(None, transcript_cache.get, digest, transcript_model)
+
+    if result is None:
+        # Decode the upload in memory, straight into a 16 kHz waveform
+        with span("decode"):
+            audio = await decode_upload(file, max_seconds=config.MAX_AUDIO_SECONDS,
+                                        chunk_size=config.AUDIO_CHUNK_BYTES)
+
+        # Only speech goes to Whisper; its cost grows with every second of audio
+        vad_report = None
+        if config.VAD_MODE != "off":
+            with span("vad"):
+                audio, vad_report = trim_audio(audio)
+
+        # Transcribe audio (a clip with no speech at all has nothing to transcribe)
+        if len(audio):
+            result = await transcribe_clip(audio)
+        else:
+            result = {"text": ""}
+        result["vad"] = vad_report
+        if transcript_cache is not None:
+            await loop.run_in_executor(None, transcript_cache.put, digest, transcript_model, result)
+
+    response = await schedule_transcription(result["text"])
+    response["vad"] = result.get("vad")
+    return response
+
+# Upload endpoint. mode=async (or UPLOAD_MODE=async) queues the recording as a job and answers 202
+# with its id right away; the result is then read from /jobs/{id} or streamed from /jobs/{id}/events.
+@app.post("/upload")
+async def upload_audio(file: UploadFile = File(...), mode: str = config.UPLOAD_MODE):
+    if mode != "async":
+        with request_trace("upload", filename=file.filename):
+            return await process_upload(file)
+
+    data = await file.read(config.JOB_MAX_UPLOAD_BYTES + 1)
+    if len(data) > config.JOB_MAX_UPLOAD_BYTES:
+        raise AudioTooLong(f"Upload is larger than {config.JOB_MAX_UPLOAD_BYTES} bytes")
+    job = await job_store.submit(file.filename, data)
+    return JSONResponse(status_code=202, content={
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['id']}",
+        "events_url": f"/jobs/{job['id']}/events"
+    })
+
+async def run_upload_job(upload):
+    with request_trace("upload.job", filename=upload.filename):
+        return await process_upload(upload)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await job_store.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": "Unknown or expired job"})
+    return job
+
+# Server-sent events: one "status" event whenever the job changes, the last one carrying the result
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    if await job_store.get(job_id) is None:
+        return JSONResponse(status_code=404, content={"detail": "Unknown or expired job"})
+
+    async def events():
+        last_update = None
+        while True:
+            job = await job_store.get(job_id)
+            if job is None:
+                return
+            if job["updated"] != last_update:
+                last_update = job["updated"]
+                yield f"event: status\ndata: {json.dumps(job)}\n\n"
+            if job["status"] in FINISHED:
+                return
+            await asyncio.sleep(config.JOB_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# Prometheus scrape endpoint (stage timings are only collected when TRACING_ENABLED is on)
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# Streaming endpoint: binary messages carry recorder chunks, a "stop" text message ends the recording.
+# The server answers with {"type": "partial"} previews while recording and one {"type": "final"}
+# message shaped like the /upload response, or {"type": "error"}.
+@app.websocket("/stream")
+async def stream_audio(websocket: WebSocket):
+    await websocket.accept()
+
+    # Each partial extends or rewrites the tail of the previous one, so only the change is re-scanned
+    preview_parser = IncrementalParser()
+
+    async def send_partial(text):
+        events = preview_parser.update(text)
+        await websocket.send_json({"type": "partial", "text": text, "events": [e.to_dict() for e in events]})
+
+    transcriber = StreamingTranscriber(
+        transcribe_audio,
+        send_partial,
+        window_seconds=config.STREAM_WINDOW_SECONDS,
+        step_seconds=config.STREAM_STEP_SECONDS,
+        max_seconds=config.MAX_AUDIO_SECONDS
+    )
+    await transcriber.start()
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                await transcriber.add_chunk(message["bytes"])
+            elif message.get("text") == "stop":
+                break
+
+        with request_trace("stream"):
+            with span("transcribe.final"):
+                transcription = await transcriber.finish()
+            final = await schedule_transcription(transcription)
+        await websocket.send_json({"type": "final", **final})
+    except (AudioTooLong, AudioDecodeError, ExecutorSaturated) as exc:
+        await websocket.send_json({"type": "error", "detail": str(exc)})
+    finally:
+        await transcriber.close()
+
+    await websocket.close()
@@ -0,0 +1,204 @@
+"""
+Index of recently created calendar events, so the same event is not inserted twice.
+
+Catches retried uploads and repeated utterances ("gym tomorrow at 7", said again a minute
+later) before they reach the Calendar API. Events are identified by a fingerprint of their
+normalized activity, start, end and location, built from Event.to_dict(). An event whose
+fingerprint was recorded within the last `window` seconds is a duplicate, and gets the
+htmlLink of the event created the first time instead of a new insert.
+
+MemoryEventIndex keeps the index in this process; SQLiteEventIndex keeps it in a local file
+shared by every worker and kept across restarts. DedupInserter puts an index in front of the
+insert calls and also catches duplicates whose first insert has not finished yet.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def _normalize(text):
+    return " ".join(text.lower().split()) if text else ""
+
+
+def _component_time(event_dict, prefix):
+    parts = [event_dict.get(f"{prefix}_{name}") for name in ("year", "month", "day", "hour", "minute")]
+    if any(part is None for part in parts):
+        return ""
+    return "{:04d}-{:02d}-{:02d}T{:02d}:{:02d}".format(*parts)
+
+
+def event_fingerprint(event_dict):
+    """Stable fingerprint of an Event.to_dict(): activity, start, end and location, normalized"""
+    key = "\x1f".join((
+        _normalize(event_dict.get("activity")),
+        _component_time(event_dict, "start"),
+        _component_time(event_dict, "end"),
+        _normalize(event_dict.get("location")),
+    ))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class MemoryEventIndex:
+    def __init__(self, window=86400, maxsize=100000):
+        self.window = window
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # fingerprint -> (recorded_at, htmlLink), oldest first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        """The htmlLink recorded for this fingerprint within the window, or None"""
+        with self._lock:
+            self._expire(time.time())
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, fingerprint, link):
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+            self._entries[fingerprint] = (time.time(), link)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        while self._entries:
+            fingerprint, (recorded_at, _) = next(iter(self._entries.items()))
+            if recorded_at >= cutoff:
+                break
+            del self._entries[fingerprint]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        pass
+
+
+class SQLiteEventIndex:
+    def __init__(self, path, window=86400):
+        self.path = path
+        self.window = window
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " fingerprint TEXT PRIMARY KEY,"
+            " link TEXT,"
+            " recorded_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_recorded_at ON events (recorded_at)")
+
+    def get(self, fingerprint):
+        """The htmlLink recorded for this fingerprint within the window, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT link FROM events WHERE fingerprint = ? AND recorded_at >= ?",
+                                   (fingerprint, time.time() - self.window)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put(self, fingerprint, link):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO events (fingerprint, link, recorded_at) VALUES (?, ?, ?)",
+                             (fingerprint, link, now))
+            self._db.execute("DELETE FROM events WHERE recorded_at < ?", (now - self.window,))
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        return {"entries": count, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class DedupInserter:
+    def __init__(self, index, submit):
+        """
+        index: MemoryEventIndex or SQLiteEventIndex
+        submit: callable taking a Google Calendar event body and returning a Future of its htmlLink
+        """
+        self.index = index
+        self.submit = submit
+        self._lock = threading.Lock()
+        # fingerprint -> Future shared by every request waiting on the insert still creating it
+        self._inflight = {}
+
+    def insert_many(self, event_dicts, bodies):
+        """
+        Insert events that were not created recently and return (htmlLinks, duplicate flags), in order.
+
+        Duplicates, of recent events, of inserts still in flight or of another event in the same list,
+        reuse the existing htmlLink. Every successful insert is recorded before the first error (if any)
+        is raised, so a retried request does not create those events again.
+        """
+        links = [None] * len(bodies)
+        duplicates = [False] * len(bodies)
+        waiting = []  # (index, shared future)
+        for i, (event_dict, body) in enumerate(zip(event_dicts, bodies)):
+            fingerprint = event_fingerprint(event_dict)
+            with self._lock:
+                shared = self._inflight.get(fingerprint)
+                if shared is not None:
+                    duplicates[i] = True
+                    waiting.append((i, shared))
+                    continue
+                link = self.index.get(fingerprint)
+                if link is not None:
+                    links[i] = link
+                    duplicates[i] = True
+                    continue
+                # Claimed before submitting, so a duplicate arriving meanwhile waits on this insert
+                shared = self._inflight[fingerprint] = Future()
+            waiting.append((i, shared))
+            try:
+                insert = self.submit(body)
+            except Exception as exc:
+                self._settle(fingerprint, shared, None, exc)
+            else:
+                insert.add_done_callback(
+                    lambda done, fingerprint=fingerprint, shared=shared: self._settle(
+                        fingerprint, shared, done, done.exception()))
+
+        error = None
+        for i, shared in waiting:
+            exc = shared.exception()
+            if exc is not None:
+                error = error or exc
+                continue
+            links[i] = shared.result()
+        if error is not None:
+            raise error
+        return links, duplicates
+
+    def _settle(self, fingerprint, shared, insert, exc):
+        # Recorded in the index before it leaves _inflight, so no duplicate slips in between
+        try:
+            if exc is None:
+                self.index.put(fingerprint, insert.result())
+        finally:
+            with self._lock:
+                self._inflight.pop(fingerprint, None)
+            if exc is None:
+                shared.set_result(insert.result())
+            else:
+                # A failed insert is forgotten, so the next request for this event tries again
+                shared.set_exception(exc)
@@ -0,0 +1,48 @@
+"""
+Bounded thread pools for blocking work done on behalf of async request handlers.
+
+Whisper inference and Google API calls block for seconds; running them inline in an
+async endpoint freezes the event loop for every other client. A BoundedExecutor runs
+them on worker threads instead, and caps how many calls may be running or waiting so
+an overloaded server answers "busy" right away rather than queueing without limit.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an executor already has max_workers running and max_queue waiting calls"""
+
+
+class BoundedExecutor:
+    def __init__(self, name, max_workers, max_queue):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on a worker thread, or raise ExecutorSaturated immediately if full"""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(f"{self.name} executor is saturated")
+        try:
+            # Carry the caller's context along, so request-scoped timing spans see their request
+            context = contextvars.copy_context()
+            future = self._executor.submit(functools.partial(context.run, func, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+        # A cancelled caller stops waiting, but its call keeps the thread busy until it returns,
+        # so the slot is only freed when the call is done
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
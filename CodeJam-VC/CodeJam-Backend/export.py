@@ -0,0 +1,209 @@
+"""
+Export parsed events to files instead of inserting them one by one.
+
+Backfills and offline users can produce thousands of events; one API insert per event is slow
+and burns quota, while importing a single .ics file into Google Calendar (or any other calendar)
+is one step. Events are written as they arrive from the iterator, so memory stays constant no
+matter how many there are.
+
+Two formats:
+    ics    an RFC 5545 iCalendar file, one VEVENT per event in America/Toronto time
+    jsonl  one Event.to_dict() object per line
+
+Output paths ending in .gz are gzip-compressed. From the command line, transcripts in the
+backfill.py input format are parsed and their events exported:
+
+    python export.py transcripts.jsonl calendar.ics --workers 0
+    python export.py transcripts.jsonl events.jsonl.gz
+    cat transcripts.jsonl | python export.py - - --format ics > calendar.ics
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+from event_index import event_fingerprint
+
+TIMEZONE = "America/Toronto"
+PRODID = "-//CodeJam-VC//Voice Calendar//EN"
+
+# RFC 5545 requires a definition for every TZID used; these are the current Toronto DST rules
+VTIMEZONE = [
+    "BEGIN:VTIMEZONE",
+    f"TZID:{TIMEZONE}",
+    "BEGIN:DAYLIGHT",
+    "TZOFFSETFROM:-0500",
+    "TZOFFSETTO:-0400",
+    "TZNAME:EDT",
+    "DTSTART:19700308T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU",
+    "END:DAYLIGHT",
+    "BEGIN:STANDARD",
+    "TZOFFSETFROM:-0400",
+    "TZOFFSETTO:-0500",
+    "TZNAME:EST",
+    "DTSTART:19701101T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU",
+    "END:STANDARD",
+    "END:VTIMEZONE",
+]
+
+
+def _escape_text(text):
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line):
+    """A content line with CRLF, folded so no physical line is longer than 75 octets (section 3.1)"""
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    current = []
+    size = 0
+    limit = 75
+    for char in line:
+        # Never split a multi-byte character across lines
+        octets = len(char.encode("utf-8"))
+        if size + octets > limit:
+            parts.append("".join(current))
+            current = []
+            size = 0
+            limit = 74  # continuation lines start with a space
+        current.append(char)
+        size += octets
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _local_time(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def ics_event_lines(event, dtstamp):
+    """The content lines of one Event's VEVENT"""
+    # The same event always gets the same UID, so importing an export twice updates instead of duplicating
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event_fingerprint(event.to_dict())}@codejam-vc",
+        f"DTSTAMP:{dtstamp}",
+        f"DTSTART;TZID={TIMEZONE}:{_local_time(event.start)}",
+    ]
+    # DTEND must be after DTSTART. The parser gives an event's end the start's date, so an end
+    # before the start ("11 PM", "10 PM to 1 AM") is on the next day; an event with no real end
+    # gets the parser's default hour, since without DTEND it would end when it starts.
+    end = event.end
+    if end is not None and end < event.start:
+        end += timedelta(days=1)
+    if end is not None and end > event.start:
+        lines.append(f"DTEND;TZID={TIMEZONE}:{_local_time(end)}")
+    else:
+        lines.append("DURATION:PT1H")
+    if event.activity:
+        lines.append(f"SUMMARY:{_escape_text(event.activity)}")
+    if event.location:
+        lines.append(f"LOCATION:{_escape_text(event.location)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def write_ics(events, output):
+    """
+    Write an iterable of Events to a text file as one iCalendar object; returns the number written.
+
+    Events without a start time are skipped. Open the file with newline="" so the CRLF line
+    endings iCalendar needs are written as they are.
+    """
+    dtstamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    header = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN"] + VTIMEZONE
+    output.write("".join(_fold(line) for line in header))
+
+    count = 0
+    for event in events:
+        if event.start is None:
+            continue
+        output.write("".join(_fold(line) for line in ics_event_lines(event, dtstamp)))
+        count += 1
+
+    output.write(_fold("END:VCALENDAR"))
+    return count
+
+
+def write_jsonl(events, output):
+    """Write an iterable of Events to a text file as one JSON object per line; returns the number written"""
+    count = 0
+    for event in events:
+        output.write(json.dumps(event.to_dict()) + "\n")
+        count += 1
+    return count
+
+
+WRITERS = {
+    "ics": write_ics,
+    "jsonl": write_jsonl,
+}
+
+
+def output_format(path):
+    """The export format a path's extension asks for (ignoring a trailing .gz), or None"""
+    base = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(base)[1].lstrip(".").lower()
+    return extension if extension in WRITERS else None
+
+
+def open_output(path, compress=None):
+    """
+    Open an export file for writing text: "-" is stdout, and a path ending in .gz (or compress=True)
+    is gzip-compressed
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    if path == "-":
+        if compress:
+            return gzip.open(sys.stdout.buffer, "wt", encoding="utf-8", newline="")
+        sys.stdout.reconfigure(newline="")
+        return sys.stdout
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def export_events(events, path, file_format=None, compress=None):
+    """Write an iterable of Events to path in the given format (by default, the one its extension names)"""
+    file_format = file_format or output_format(path)
+    if file_format not in WRITERS:
+        raise ValueError(f"Unknown export format for {path!r}; use one of: {', '.join(WRITERS)}")
+
+    with open_output(path, compress) as output:
+        return WRITERS[file_format](events, output)
+
+
+if __name__ == "__main__":
+    from backfill import read_records, to_pair
+    from main import parse_schedule_to_events_many
+
+    parser = argparse.ArgumentParser(description="Parse JSONL transcripts and export their events as .ics or JSONL")
+    parser.add_argument("input", nargs="?", default="-", help="input JSONL file, or - for stdin")
+    parser.add_argument("output", nargs="?", default="-", help="output file (.ics, .jsonl, optionally .gz), or -")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="output format; defaults to the output extension")
+    parser.add_argument("--gzip", action="store_true", default=None, help="compress the output")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; 1 parses in-process, 0 uses every core")
+    parser.add_argument("--chunk-size", type=int, default=256, help="transcripts sent to a worker at a time")
+    args = parser.parse_args()
+
+    if args.format is None and output_format(args.output) is None:
+        parser.error("cannot tell the format from the output name; pass --format")
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with input_file:
+        pairs = (to_pair(record) for record in read_records(input_file))
+        event_lists = parse_schedule_to_events_many(pairs, args.workers or None, args.chunk_size)
+        events = (event for event_list in event_lists for event in event_list)
+        count = export_events(events, args.output, args.format, args.gzip)
+
+    print(f"exported {count} events", file=sys.stderr)
@@ -0,0 +1,175 @@
+"""
+Incremental re-parsing of a transcript that grows while it is being dictated.
+
+Live previews re-parse the whole transcript after every partial, so a long dictated agenda
+pays for parsing the same opening sentences again and again. An IncrementalParser keeps the
+events of every clause before the last one, and re-parses such a clause only if its text or
+date changed. For the last clause, the one still being dictated, it keeps the regex matches
+of the time patterns and the location scans. When the new clause shares a prefix with the
+old one (text was appended, or only the uncommitted tail was rewritten), only the part near
+and after the change is scanned again. Activity and event building read the whole clause
+and run on every change.
+
+The events are always the same as parse_schedule_to_events(text, reference_date) returns.
+A time pattern can look across at most a handful of whitespace-separated words, so matches
+that start at least STABLE_WORDS words before the end of the unchanged prefix can be kept
+as they were found.
+"""
+import re
+from datetime import datetime
+
+from main import (DIGIT_PATTERN, TIME_PATTERNS, WORD_TIME_PATTERN, AnnotatedSentence, build_clause_events,
+                  claim_time_mentions, location_mention, parse_clause, resolve_clause_dates, scan_location_at,
+                  scan_time_matches, split_clauses)
+from metrics import span
+
+# Whitespace runs a time pattern may span (the range patterns have five), with room to spare
+STABLE_WORDS = 8
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# The patterns behind scan_time_matches(), in the same order
+SCAN_PATTERNS = [pattern for pattern, _ in TIME_PATTERNS] + [WORD_TIME_PATTERN]
+
+
+def common_prefix_length(a, b):
+    """Length of the longest common prefix of two strings"""
+    if b.startswith(a):
+        return len(a)
+    low, high = 0, min(len(a), len(b))
+    # Slice comparisons run in C, so a binary search beats a character loop on long text
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def stable_scan_point(sentence_lower, stable):
+    """
+    Where the time pattern scan must restart after a change at `stable`, or None to scan it all.
+
+    A match attempt starting before this point only reads characters inside the unchanged prefix,
+    so it finds exactly what it found last time.
+    """
+    # Only the last few whitespace runs matter; look back just far enough to find them
+    window = 256
+    while True:
+        start = max(0, stable - window)
+        runs = [run.start() for run in WHITESPACE_PATTERN.finditer(sentence_lower, start, stable)
+                if run.end() < stable]
+        # A run cut off by the window edge still counts as a boundary between words
+        if len(runs) >= STABLE_WORDS + 1 or start == 0:
+            break
+        window *= 4
+    if len(runs) < STABLE_WORDS + 1:
+        return None
+    return runs[-STABLE_WORDS]
+
+
+class IncrementalParser:
+    def __init__(self, reference_date=None):
+        self.reference_date = reference_date if reference_date is not None else datetime.now()
+        self.text = None
+        self._finished_clauses = {}
+        self._last_clause = _ClauseScanner()
+        self._events = []
+
+    def append(self, text):
+        """Add text to the end of the transcript and return its events"""
+        return self.update((self.text or "") + text)
+
+    def update(self, text):
+        """Replace the transcript with text and return its events"""
+        if text == self.text:
+            return list(self._events)
+
+        clauses = [AnnotatedSentence(clause) for clause in split_clauses(text.lower())]
+        clause_dates = resolve_clause_dates(clauses, self.reference_date)
+
+        # Clauses before the last one rarely change once the speaker has moved on
+        events = []
+        finished = {}
+        for clause, date_info in zip(clauses[:-1], clause_dates):
+            key = (clause.text, date_info['year'], date_info['month'], date_info['day'])
+            clause_events = self._finished_clauses.get(key)
+            if clause_events is None:
+                clause_events = parse_clause(clause, date_info, self.reference_date)
+            finished[key] = clause_events
+            events.extend(clause_events)
+
+        # The last clause is the one still being dictated
+        with span("parse.incremental.scan"):
+            self._last_clause.update(clauses[-1])
+        with span("parse.incremental.rest"):
+            events.extend(build_clause_events(clauses[-1], clause_dates[-1], self.reference_date))
+
+        self.text = text
+        self._finished_clauses = finished
+        self._events = events
+        return list(events)
+
+
+class _ClauseScanner:
+    """Time and location mentions of one clause, re-scanning only what changed since the last update"""
+
+    def __init__(self):
+        self._lower = None
+        self._matches = None
+        self._location_scans = []
+
+    def update(self, clause):
+        """Add the time and location spans of an AnnotatedSentence clause"""
+        clause_lower = clause.text
+        stable = common_prefix_length(self._lower, clause_lower) if self._lower is not None else 0
+        self._matches = self._rescan_times(clause_lower, stable)
+        clause.add('time', claim_time_mentions(clause_lower, self._matches))
+
+        self._location_scans = self._rescan_locations(clause.words, clause_lower, stable)
+        clause.add('location', [location_mention(clause, *location)
+                                for _, _, location in self._location_scans if location is not None])
+
+        self._lower = clause_lower
+
+    def _rescan_times(self, sentence_lower, stable):
+        """Pattern matches for the new text, keeping those found well inside the unchanged prefix"""
+        safe = stable_scan_point(sentence_lower, stable)
+        if self._matches is None or safe is None:
+            return scan_time_matches(sentence_lower)
+
+        has_digit = DIGIT_PATTERN.search(sentence_lower, safe)
+        matches = []
+        for pattern, found in zip(SCAN_PATTERNS, self._matches):
+            kept = list(found)
+            while kept and kept[-1].start() >= safe:
+                kept.pop()
+            # The scan carries on where the last kept match ended, or at `safe` if that is further
+            resume = max(safe, kept[-1].end()) if kept else safe
+            if has_digit or pattern is WORD_TIME_PATTERN:
+                kept.extend(pattern.finditer(sentence_lower, resume))
+            matches.append(kept)
+        return matches
+
+    def _rescan_locations(self, words, sentence_lower, stable):
+        """Location scans for the new words, keeping those that only read words inside the unchanged prefix"""
+        # Words followed by whitespace inside the prefix are the same words at the same indexes in both texts
+        prefix = sentence_lower[:stable]
+        stable_words = len(prefix.split())
+        if prefix and not prefix[-1].isspace():
+            stable_words -= 1
+
+        scans = []
+        resume = stable_words
+        for scan in self._location_scans:
+            index, examined, _ = scan
+            if examined >= stable_words:
+                resume = min(resume, index)
+                break
+            scans.append(scan)
+
+        for index in range(resume, len(words)):
+            location, examined = scan_location_at(words, index)
+            # Indicator words are remembered even when they introduce no location
+            if examined != index or location is not None:
+                scans.append((index, examined, location))
+        return scans
@@ -0,0 +1,222 @@
+"""
+Background jobs for /upload.
+
+In job mode /upload only stores the uploaded bytes as a job and answers at once with its id,
+so long recordings do not hold the connection open through decoding, transcription, parsing
+and every calendar insert; a JobRunner's workers process the jobs, and clients poll
+/jobs/{id} or follow /jobs/{id}/events until the job is done.
+
+Two stores hold the queue and the job states:
+    MemoryJobStore  an asyncio queue inside this worker process (the default)
+    RedisJobStore   a Redis list and hashes, so jobs survive a worker restart and any
+                    uvicorn worker can pick them up; needs the optional redis package
+
+A job is a dict with id, filename, status ("queued", "running", "done" or "failed"),
+created and updated timestamps, and the /upload response as result or an error message.
+Finished jobs are forgotten after ttl seconds.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from executors import ExecutorSaturated
+
+logger = logging.getLogger("voicecal.jobs")
+
+FINISHED = ("done", "failed")
+
+
+class BytesUpload:
+    """Async file-like view of stored upload bytes, for code written against UploadFile"""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self._data = data
+        self._position = 0
+
+    async def read(self, size=-1):
+        end = len(self._data) if size is None or size < 0 else self._position + size
+        chunk = self._data[self._position:end]
+        self._position += len(chunk)
+        return chunk
+
+    async def seek(self, offset):
+        self._position = offset
+
+
+def _new_job(filename):
+    now = time.time()
+    return {"id": uuid.uuid4().hex, "filename": filename, "status": "queued", "created": now, "updated": now,
+            "result": None, "error": None}
+
+
+class MemoryJobStore:
+    def __init__(self, max_queue=64, ttl=3600):
+        self.ttl = ttl
+        self._jobs = {}
+        self._queue = asyncio.Queue(maxsize=max_queue)
+
+    async def submit(self, filename, data):
+        """Queue an upload; returns the new job, or raises ExecutorSaturated when the queue is full"""
+        self._expire()
+        job = _new_job(filename)
+        try:
+            self._queue.put_nowait((job["id"], data))
+        except asyncio.QueueFull:
+            raise ExecutorSaturated("job queue is full") from None
+        self._jobs[job["id"]] = job
+        return dict(job)
+
+    async def next(self):
+        """Wait for the next queued job; returns (job, upload bytes)"""
+        job_id, data = await self._queue.get()
+        return dict(self._jobs[job_id]), data
+
+    async def update(self, job_id, **fields):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.update(fields, updated=time.time())
+
+    async def get(self, job_id):
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job["status"] in FINISHED and job["updated"] < cutoff]:
+            del self._jobs[job_id]
+
+    async def close(self):
+        pass
+
+
+class RedisJobStore:
+    """Jobs in Redis: a hash per job, the upload bytes under their own key and a list as the queue"""
+
+    def __init__(self, url, max_queue=64, ttl=3600, prefix="voicecal:jobs"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("JOB_STORE=redis needs the redis package: pip install redis") from None
+
+        self.ttl = ttl
+        self.max_queue = max_queue
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+
+    def _key(self, *parts):
+        return ":".join((self.prefix, *parts))
+
+    async def submit(self, filename, data):
+        if await self._redis.llen(self._key("queue")) >= self.max_queue:
+            raise ExecutorSaturated("job queue is full")
+        job = _new_job(filename)
+        job_id = job["id"]
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(job_id, "audio"), data, ex=self.ttl)
+            pipe.set(self._key(job_id), json.dumps(job), ex=self.ttl)
+            pipe.lpush(self._key("queue"), job_id)
+            await pipe.execute()
+        return job
+
+    async def next(self):
+        while True:
+            _, job_id = await self._redis.brpop(self._key("queue"))
+            job_id = job_id.decode()
+            try:
+                data = await self._redis.getdel(self._key(job_id, "audio"))
+                job = await self.get(job_id)
+            except Exception as exc:
+                # The id is off the queue already; record the job as failed rather than drop it
+                try:
+                    await self.update(job_id, status="failed", error=f"job store error: {exc}")
+                except Exception:
+                    logger.exception("Could not mark job %s failed", job_id)
+                raise
+            # Jobs that waited longer than ttl have expired and are skipped
+            if job is not None and data is not None:
+                return job, data
+
+    async def update(self, job_id, **fields):
+        job = await self.get(job_id)
+        if job is not None:
+            job.update(fields, updated=time.time())
+            await self._redis.set(self._key(job_id), json.dumps(job), ex=self.ttl)
+
+    async def get(self, job_id):
+        payload = await self._redis.get(self._key(job_id))
+        return json.loads(payload) if payload is not None else None
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+class JobRunner:
+    def __init__(self, store, handler, workers=2, busy_retry_after=2.0, store_retry_after=1.0,
+                 max_store_retry_after=30.0):
+        """
+        handler: async callable taking an UploadFile-like object and returning the job result
+        store_retry_after: seconds a worker waits after a job store error, doubled after each
+        further error up to max_store_retry_after
+        """
+        self.store = store
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.busy_retry_after = busy_retry_after
+        self.store_retry_after = store_retry_after
+        self.max_store_retry_after = max_store_retry_after
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.store.close()
+
+    async def _work(self):
+        delay = self.store_retry_after
+        while True:
+            # Store errors (a dropped Redis connection, say) must not end the worker
+            try:
+                job, data = await self.store.next()
+            except Exception:
+                logger.exception("Job store failed; retrying in %.1f s", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_store_retry_after)
+                continue
+            delay = self.store_retry_after
+            try:
+                await self.store.update(job["id"], status="running")
+                result = await self._run(job, data)
+            except Exception as exc:
+                logger.exception("Job %s failed", job["id"])
+                await self._finish(job["id"], status="failed", error=str(exc) or type(exc).__name__)
+            else:
+                await self._finish(job["id"], status="done", result=result)
+
+    async def _run(self, job, data):
+        while True:
+            try:
+                return await self.handler(BytesUpload(job["filename"], data))
+            except ExecutorSaturated:
+                # Synchronous requests filled the pools; this job can wait its turn
+                await asyncio.sleep(self.busy_retry_after)
+
+    async def _finish(self, job_id, attempts=3, **fields):
+        """Record a job's outcome, retrying store errors so a taken job is not left running"""
+        delay = self.store_retry_after
+        for attempt in range(attempts):
+            try:
+                await self.store.update(job_id, **fields)
+                return
+            except Exception:
+                logger.exception("Could not record job %s as %s", job_id, fields["status"])
+                if attempt + 1 < attempts:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_store_retry_after)
@@ -1,25 +1,63 @@
 #! python3.7
 
+import os
 import re
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+from itertools import islice, repeat
+from operator import itemgetter
+
+from metrics import span
+
+
+def _component_datetime(year, month, day, hour, minute):
+    """Build a datetime from date/time components, or None when any component is missing"""
+    if None in (year, month, day, hour, minute):
+        return None
+    return datetime(year, month, day, hour, minute)
+
+
+def _format_event_time(value):
+    """Format an event datetime in 12-hour display format, e.g. '5:30 PM 2025-11-24'"""
+    # Convert back to 12-hour format for display
+    display_hour = value.hour % 12 or 12
+    am_pm = "PM" if value.hour >= 12 else "AM"
+
+    time_str = f"{display_hour}"
+    if value.minute > 0:
+        time_str += f":{value.minute:02d}"
+    return f"{time_str} {am_pm} {value.year}-{value.month:02d}-{value.day:02d}"
 
 
 class Event:
+    """
+    A parsed calendar event.
+
+    Start and end are stored as naive datetimes; the year/month/day/hour/minute components are
+    read-only properties over them. Components that do not form a valid datetime raise ValueError.
+    """
+    __slots__ = ('activity', 'location', 'start', 'end')
+
     def __init__(self, activity=None, location=None,
                  start_year=None, start_month=None, start_day=None, start_hour=None, start_minute=None,
                  end_year=None, end_month=None, end_day=None, end_hour=None, end_minute=None):
         self.activity = activity
         self.location = location
-        self.start_year = start_year
-        self.start_month = start_month
-        self.start_day = start_day
-        self.start_hour = start_hour
-        self.start_minute = start_minute
-        self.end_year = end_year
-        self.end_month = end_month
-        self.end_day = end_day
-        self.end_hour = end_hour
-        self.end_minute = end_minute
+        self.start = _component_datetime(start_year, start_month, start_day, start_hour, start_minute)
+        self.end = _component_datetime(end_year, end_month, end_day, end_hour, end_minute)
+
+    start_year = property(lambda self: self.start.year if self.start else None)
+    start_month = property(lambda self: self.start.month if self.start else None)
+    start_day = property(lambda self: self.start.day if self.start else None)
+    start_hour = property(lambda self: self.start.hour if self.start else None)
+    start_minute = property(lambda self: self.start.minute if self.start else None)
+    end_year = property(lambda self: self.end.year if self.end else None)
+    end_month = property(lambda self: self.end.month if self.end else None)
+    end_day = property(lambda self: self.end.day if self.end else None)
+    end_hour = property(lambda self: self.end.hour if self.end else None)
+    end_minute = property(lambda self: self.end.minute if self.end else None)
 
     def __str__(self):
         parts = []
@@ -27,14 +65,10 @@ class Event:
             parts.append(f"Activity: {self.activity}")
         if self.location:
             parts.append(f"Location: {self.location}")
-
-        start_time = self.get_start_time_str()
-        end_time = self.get_end_time_str()
-
-        if start_time:
-            parts.append(f"Start: {start_time}")
-        if end_time:
-            parts.append(f"End: {end_time}")
+        if self.start:
+            parts.append(f"Start: {_format_event_time(self.start)}")
+        if self.end:
+            parts.append(f"End: {_format_event_time(self.end)}")
 
         return "Event(" + ", ".join(parts) + ")"
 
@@ -43,157 +77,342 @@ class Event:
 
     def get_start_time_str(self):
         """Format start time as string"""
-        if self.start_hour is not None:
-            # Convert back to 12-hour format for display
-            display_hour = self.start_hour
-            am_pm = "AM"
-            if self.start_hour == 0:
-                display_hour = 12
-            elif self.start_hour == 12:
-                am_pm = "PM"
-            elif self.start_hour > 12:
-                display_hour = self.start_hour - 12
-                am_pm = "PM"
-
-            time_str = f"{display_hour}"
-            if self.start_minute is not None and self.start_minute > 0:
-                time_str += f":{self.start_minute:02d}"
-            time_str += f" {am_pm}"
-
-            if self.start_year and self.start_month and self.start_day:
-                time_str += f" {self.start_year}-{self.start_month:02d}-{self.start_day:02d}"
-            return time_str
-        return None
+        return _format_event_time(self.start) if self.start else None
 
     def get_end_time_str(self):
         """Format end time as string"""
-        if self.end_hour is not None:
-            # Convert back to 12-hour format for display
-            display_hour = self.end_hour
-            am_pm = "AM"
-            if self.end_hour == 0:
-                display_hour = 12
-            elif self.end_hour == 12:
-                am_pm = "PM"
-            elif self.end_hour > 12:
-                display_hour = self.end_hour - 12
-                am_pm = "PM"
-
-            time_str = f"{display_hour}"
-            if self.end_minute is not None and self.end_minute > 0:
-                time_str += f":{self.end_minute:02d}"
-            time_str += f" {am_pm}"
-
-            if self.end_year and self.end_month and self.end_day:
-                time_str += f" {self.end_year}-{self.end_month:02d}-{self.end_day:02d}"
-            return time_str
-        return None
+        return _format_event_time(self.end) if self.end else None
 
     def to_dict(self):
         """Return all attributes as a dictionary"""
+        start = self.start
+        end = self.end
         return {
             "activity": self.activity,
             "location": self.location,
-            "start_year": self.start_year,
-            "start_month": self.start_month,
-            "start_day": self.start_day,
-            "start_hour": self.start_hour,
-            "start_minute": self.start_minute,
-            "end_year": self.end_year,
-            "end_month": self.end_month,
-            "end_day": self.end_day,
-            "end_hour": self.end_hour,
-            "end_minute": self.end_minute
+            "start_year": start.year if start else None,
+            "start_month": start.month if start else None,
+            "start_day": start.day if start else None,
+            "start_hour": start.hour if start else None,
+            "start_minute": start.minute if start else None,
+            "end_year": end.year if end else None,
+            "end_month": end.month if end else None,
+            "end_day": end.day if end else None,
+            "end_hour": end.hour if end else None,
+            "end_minute": end.minute if end else None
+        }
+
+    def to_google_event(self):
+        """Return the Google Calendar event body; same result as json_to_google_event(self.to_dict())"""
+        return {
+            "summary": self.activity,
+            "location": self.location,
+            "start": {
+                "dateTime": self.start.isoformat(timespec="seconds"),
+                "timeZone": "America/Toronto",
+            },
+            "end": {
+                "dateTime": self.end.isoformat(timespec="seconds"),
+                "timeZone": "America/Toronto",
+            }
         }
 
     def is_valid(self):
         return self.activity is not None and self.activity.strip() != ""
 
 
-def detect_time_period(sentence_lower, time_mention):
-    """Detect if a time mention has morning/afternoon/evening context"""
-    # Look for time period indicators near the time mention
-    start_pos = max(0, time_mention['position'] - 30)  # Look 30 chars before
-    end_pos = min(len(sentence_lower), time_mention['end_position'] + 30)  # Look 30 chars after
-
-    context = sentence_lower[start_pos:end_pos]
-
-    # Time period mappings
-    period_indicators = {
-        'morning': 'am',
-        'afternoon': 'pm',
-        'evening': 'pm',
-        'night': 'pm',
-        'tonight': 'pm',
-        'this morning': 'am',
-        'this afternoon': 'pm',
-        'this evening': 'pm',
-        'this night': 'pm'
-    }
+class AnnotatedSentence:
+    """
+    A lowercased sentence or clause together with everything the parser stages recognized in it.
+
+    The text is split into words once, and word offsets are only computed the first time a stage
+    asks for them. spans maps a kind to a list of span dicts, each with at least 'position' and
+    'end_position', sorted by position:
+        'date'      what decided the date (added by extract_detailed_date_info)
+        'time'      time mentions (extract_all_time_mentions)
+        'location'  locations (extract_locations)
+        'offset'    relative offsets like "in 3 days", with their 'unit' and 'amount'
+        'period'    time period words like "morning", with the 'am_pm' they imply
+    'offset' and 'period' are lexical and scanned on first use; the others are added by their stage.
+    """
+    __slots__ = ('text', 'spans', '_words', '_starts', '_ends', '_positions')
+
+    def __init__(self, text):
+        self.text = text
+        self.spans = {}
+        self._words = None
+        self._starts = None
+        self._ends = None
+        self._positions = {}
+
+    @property
+    def words(self):
+        """Whitespace-separated words of the text"""
+        if self._words is None:
+            self._words = self.text.split()
+        return self._words
+
+    def offsets(self):
+        """Start and end character offsets of every word"""
+        if self._starts is None:
+            self._starts, self._ends = word_offsets(self.text, self.words)
+        return self._starts, self._ends
+
+    def get(self, kind):
+        """The spans of a kind; lexical kinds are scanned the first time they are asked for"""
+        spans = self.spans.get(kind)
+        if spans is None:
+            scanner = LEXICAL_SCANNERS.get(kind)
+            spans = scanner(self.text) if scanner is not None else []
+            self.spans[kind] = spans
+        return spans
+
+    def add(self, kind, spans):
+        """Record the spans a stage found and return them"""
+        self.spans[kind] = spans
+        self._positions.pop(kind, None)
+        return spans
+
+    def positions(self, kind):
+        """Start positions of the spans of a kind, in order, for bisecting"""
+        positions = self._positions.get(kind)
+        if positions is None:
+            positions = self._positions[kind] = [span['position'] for span in self.get(kind)]
+        return positions
+
+
+def word_offsets(text, words):
+    """Start and end character offsets of text.split() words in text"""
+    starts = []
+    ends = []
+    position = 0
+    for word in words:
+        # Only whitespace lies between one word and the next, so the next match is the word itself
+        position = text.find(word, position)
+        starts.append(position)
+        position += len(word)
+        ends.append(position)
+    return starts, ends
+
 
-    for indicator, am_pm in period_indicators.items():
-        if indicator in context:
-            return am_pm
+# How far (in characters) a time period word may be from a time mention and still apply to it
+PERIOD_MAX_DISTANCE = 30
+
+
+def detect_time_period(sentence, time_mention):
+    """
+    Detect if a time mention has morning/afternoon/evening context: 'am', 'pm' or None.
+
+    A period word applies if all of it lies within PERIOD_MAX_DISTANCE characters of the mention
+    and no other time mention stands between them. The one right after the mention wins over one
+    before it, as in "at 9 in the morning and at 3 in the afternoon".
+    """
+    periods = sentence.get('period')
+    if not periods:
+        return None
+
+    # The first period starting at or after the mention's end, and the one before it
+    index = bisect_left(sentence.positions('period'), time_mention['end_position'])
+
+    if index < len(periods):
+        after = periods[index]
+        if (after['end_position'] - time_mention['end_position'] <= PERIOD_MAX_DISTANCE
+                and not _time_between(sentence, time_mention['end_position'], after['position'])):
+            return after['am_pm']
+
+    if index > 0:
+        before = periods[index - 1]
+        if (time_mention['position'] - before['position'] <= PERIOD_MAX_DISTANCE
+                and not _time_between(sentence, before['end_position'], time_mention['position'])):
+            return before['am_pm']
 
     return None
 
 
-def parse_schedule_to_events(sentence, reference_date=None):
+def _time_between(sentence, start, end):
+    """Whether a whole time mention of the sentence, other than a number in its date, lies in [start, end)"""
+    mentions = sentence.get('time')
+    dates = sentence.get('date')
+    index = bisect_left(sentence.positions('time'), start)
+    # A range's own start or end is looked up with the range still in the list, so only whole mentions count
+    while index < len(mentions) and mentions[index]['position'] < end:
+        mention = mentions[index]
+        if mention['end_position'] <= end and not any(
+                date['position'] <= mention['position'] and mention['end_position'] <= date['end_position']
+                for date in dates):
+            return True
+        index += 1
+    return False
+
+
+def parse_schedule_to_events(sentence, reference_date=None, executor=None):
     """
     Parse natural language schedule and return list of Event objects
+
+    Sentences listing several things ("gym at 7 then dinner at joe's at 8") are split into clauses,
+    and each clause is parsed on its own. Pass an Executor to parse the clauses of long dictations
+    (PARALLEL_MIN_CLAUSES or more) in parallel; the events come back in clause order either way.
     """
     if reference_date is None:
         reference_date = datetime.now()
 
-    sentence_lower = sentence.lower()
-    events = []
+    clauses = [AnnotatedSentence(clause) for clause in split_clauses(sentence.lower())]
 
     # Step 1: Extract date information FIRST (before time parsing)
-    date_info = extract_detailed_date_info(sentence_lower, reference_date)
+    with span("parse.date"):
+        clause_dates = resolve_clause_dates(clauses, reference_date)
+
+    if executor is None or len(clauses) < PARALLEL_MIN_CLAUSES:
+        clause_events = map(parse_clause, clauses, clause_dates, repeat(reference_date))
+    else:
+        clause_events = executor.map(parse_clause, clauses, clause_dates, repeat(reference_date))
+    return [event for events in clause_events for event in events]
+
+
+# Handing clauses to an executor only pays off for long dictations
+PARALLEL_MIN_CLAUSES = 8
+
+# Words that start a new clause: "gym at 7 then dinner at 8", "standup at 9; lunch at 12"
+CLAUSE_SPLIT_PATTERN = re.compile(r'\s*(?:;|\band then\b|\bafter that\b|\bthen\b)\s*')
+# Spaces, commas and sentence punctuation around a clause, except the dot that ends "a.m." or "p.m."
+CLAUSE_EDGE_PATTERN = re.compile(r'^[\s,.?!]+|(?<![ap]\.m)[\s,.?!]+$')
+WORD_PATTERN = re.compile(r'\w')
+
+# Anything extract_detailed_date_info treats as a date of the clause's own
+DATE_HINT = re.compile(
+    r'in\s+\d+\s+(?:days?|weeks?|months?)|\d{1,2}\s+(?:january|february|march|april|may|june|july|august|'
+    r'september|october|november|december)|(?:january|february|march|april|may|june|july|august|september|'
+    r'october|november|december)\s+\d{1,2}|tomorrow|tmrw|today|monday|tuesday|wednesday|thursday|friday|'
+    r'saturday|sunday'
+)
+
+
+def split_clauses(sentence_lower):
+    """Split a sentence into clauses that each describe one thing; a sentence without separators is one clause"""
+    parts = CLAUSE_SPLIT_PATTERN.split(sentence_lower)
+    if len(parts) == 1:
+        return parts
+    # A trailing "then." leaves bare punctuation behind, which would parse as an event of its own
+    clauses = [clause for clause in (CLAUSE_EDGE_PATTERN.sub('', part) for part in parts)
+               if WORD_PATTERN.search(clause)]
+    return clauses or [sentence_lower]
+
+
+def resolve_clause_dates(clauses, reference_date):
+    """
+    The date_info of each AnnotatedSentence clause; a clause without a date of its own is on the same
+    day as the one before
+    """
+    clause_dates = []
+    date_info = None
+    for clause in clauses:
+        if date_info is None or DATE_HINT.search(clause.text):
+            date_info = extract_detailed_date_info(clause, reference_date)
+        clause_dates.append(date_info)
+    return clause_dates
+
 
+def parse_clause(clause, date_info, reference_date):
+    """Parse one AnnotatedSentence clause into Event objects, given its date_info"""
     # Step 2: Extract all time mentions and time ranges (but exclude relative days like "in 2 days")
-    time_mentions = extract_all_time_mentions(sentence_lower)
+    with span("parse.time_mentions"):
+        extract_all_time_mentions(clause)
 
     # Step 3: Extract locations (BEFORE activity extraction) - UPDATED to handle time periods
-    location_mentions = extract_locations(sentence_lower, time_mentions)
+    with span("parse.locations"):
+        extract_locations(clause)
+
+    return build_clause_events(clause, date_info, reference_date)
+
 
+def build_clause_events(clause, date_info, reference_date):
+    """The activity and events of a clause whose time and location spans are known"""
     # Step 4: Extract activity (AFTER location extraction)
-    activity = extract_clean_activity_full(sentence_lower, date_info, location_mentions, time_mentions)
+    with span("parse.activity"):
+        activity = extract_clean_activity_full(clause)
 
-    # Step 5: Handle relative time offsets like "in 1 hour", "in 30 minutes"
-    events = handle_relative_times(sentence_lower, activity, location_mentions, date_info, reference_date,
-                                   time_mentions)
+    with span("parse.events"):
+        # Step 5: Handle relative time offsets like "in 1 hour", "in 30 minutes"
+        events = handle_relative_times(clause, activity, date_info, reference_date)
 
-    # If no relative times were found, proceed with regular time parsing
-    if not events:
-        events = create_events_with_datetime(sentence_lower, time_mentions, date_info, location_mentions, activity,
-                                             reference_date)
+        # If no relative times were found, proceed with regular time parsing
+        if not events:
+            events = create_events_with_datetime(clause, date_info, activity, reference_date)
 
     return events
 
 
-def handle_relative_times(sentence_lower, activity, location_mentions, date_info, reference_date, time_mentions):
+# Relative time offsets ("in 30 minutes") are the only phrases that read the reference time of day
+RELATIVE_TIME_HINT = re.compile(r'in\s+\d+\s+(?:hours?|minutes?|hrs?|mins?)')
+
+
+def reference_date_key(sentence_lower, reference_date):
+    """
+    Reduce reference_date to the precision parse_schedule_to_events actually uses for this sentence.
+
+    Relative time offsets are computed to the minute. Everything else only needs the calendar day,
+    plus whether the reference is past midnight (a specific date falling on the reference day rolls
+    over to next year once the day has started).
+    """
+    if RELATIVE_TIME_HINT.search(sentence_lower):
+        return reference_date.replace(second=0, microsecond=0)
+    return reference_date.date(), reference_date.time() != time()
+
+
+def _parse_chunk(chunk):
+    """Parse one chunk of (sentence, reference_date) pairs; runs inside worker processes"""
+    return [parse_schedule_to_events(sentence, reference_date) for sentence, reference_date in chunk]
+
+
+def parse_schedule_to_events_many(pairs, workers=1, chunk_size=256):
+    """
+    Parse an iterable of (sentence, reference_date) pairs and yield one event list per pair, in input order.
+
+    With workers=1 everything runs in this process. Otherwise the pairs are split into chunks of
+    chunk_size and parsed by a ProcessPoolExecutor with that many workers (None means every core).
+    Only a few chunks per worker are in flight at a time, so arbitrarily long inputs stream through
+    with bounded memory.
+    """
+    if workers == 1:
+        for sentence, reference_date in pairs:
+            yield parse_schedule_to_events(sentence, reference_date)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    pairs = iter(pairs)
+    chunks = iter(lambda: list(islice(pairs, chunk_size)), [])
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in islice(chunks, workers * 2):
+            pending.append(executor.submit(_parse_chunk, chunk))
+
+        while pending:
+            results = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(executor.submit(_parse_chunk, chunk))
+            yield from results
+
+
+def handle_relative_times(sentence, activity, date_info, reference_date):
     """Handle relative time offsets like 'in 1 hour', 'in 30 minutes'"""
     events = []
-
-    # Patterns for relative time offsets
-    relative_time_patterns = [
-        (r'in\s+(\d+)\s+hours?', 'hours'),
-        (r'in\s+(\d+)\s+hour', 'hours'),  # singular
-        (r'in\s+(\d+)\s+minutes?', 'minutes'),
-        (r'in\s+(\d+)\s+minute', 'minutes'),  # singular
-        (r'in\s+(\d+)\s+hrs?', 'hours'),
-        (r'in\s+(\d+)\s+hr', 'hours'),  # singular
-        (r'in\s+(\d+)\s+mins?', 'minutes'),
-        (r'in\s+(\d+)\s+min', 'minutes'),  # singular
+    offsets = sentence.get('offset')
+
+    # Relative time offsets, in order of preference; the first one mentioned of the first unit found wins
+    relative_time_units = [
+        ('hours', 'hours'),
+        ('minutes', 'minutes'),
+        ('hrs', 'hours'),
+        ('mins', 'minutes'),
     ]
 
-    found_relative_time = False
-
-    for pattern, unit in relative_time_patterns:
-        match = re.search(pattern, sentence_lower)
-        if match and activity:
-            amount = int(match.group(1))
+    for pattern_type, unit in relative_time_units:
+        offset = next((offset for offset in offsets if offset['pattern'] == pattern_type), None)
+        if offset and activity:
+            amount = offset['amount']
 
             # Calculate the target time based on the relative offset
             if unit == 'hours':
@@ -218,18 +437,24 @@ def handle_relative_times(sentence_lower, activity, location_mentions, date_info
                 end_minute=end_time.minute
             )
 
-            if location_mentions:
-                event.location = location_mentions[0]
+            locations = sentence.get('location')
+            if locations:
+                event.location = locations[0]['location']
 
             events.append(event)
-            found_relative_time = True
             break
 
     return events
 
 
-def extract_detailed_date_info(sentence_lower, reference_date):
-    """Extract detailed date information including day-month combinations and relative dates"""
+def extract_detailed_date_info(sentence, reference_date):
+    """
+    Extract detailed date information including day-month combinations and relative dates.
+
+    The phrase that decided the date, if any, is added to the sentence's 'date' spans.
+    """
+    sentence_lower = sentence.text
+    date_spans = sentence.add('date', [])
     date_info = {
         'year': reference_date.year,
         'month': reference_date.month,
@@ -249,17 +474,13 @@ def extract_detailed_date_info(sentence_lower, reference_date):
     }
 
     # Pattern 1: Relative dates like "in 2 days", "in 3 weeks"
-    relative_patterns = [
-        (r'in\s+(\d+)\s+days?', 'days'),
-        (r'in\s+(\d+)\s+weeks?', 'weeks'),
-        (r'in\s+(\d+)\s+months?', 'months'),
-    ]
+    offsets = sentence.get('offset')
 
     found_relative_date = False
-    for pattern, unit in relative_patterns:
-        match = re.search(pattern, sentence_lower)
-        if match:
-            amount = int(match.group(1))
+    for unit in ('days', 'weeks', 'months'):
+        offset = next((offset for offset in offsets if offset['pattern'] == unit), None)
+        if offset:
+            amount = offset['amount']
             if unit == 'days':
                 target_date = reference_date + timedelta(days=amount)
             elif unit == 'weeks':
@@ -273,6 +494,8 @@ def extract_detailed_date_info(sentence_lower, reference_date):
                 'month': target_date.month,
                 'day': target_date.day
             })
+            date_spans.append({'position': offset['position'], 'end_position': offset['end_position'],
+                               'pattern': 'relative'})
             found_relative_date = True
             break
 
@@ -312,6 +535,8 @@ def extract_detailed_date_info(sentence_lower, reference_date):
                         except ValueError:
                             pass  # Invalid date, keep current year
 
+                        date_spans.append({'position': match.start(), 'end_position': match.end(),
+                                           'pattern': 'specific'})
                         found_specific_date = True
                         break
 
@@ -324,9 +549,10 @@ def extract_detailed_date_info(sentence_lower, reference_date):
                 'month': tomorrow.month,
                 'day': tomorrow.day
             })
+            date_spans.append(_day_span(sentence_lower, 'tomorrow' if 'tomorrow' in sentence_lower else 'tmrw'))
         elif 'today' in sentence_lower:
             # Already using reference_date (today)
-            pass
+            date_spans.append(_day_span(sentence_lower, 'today'))
         else:
             # Check for days of week
             for day_name, day_offset in day_mapping.items():
@@ -341,202 +567,249 @@ def extract_detailed_date_info(sentence_lower, reference_date):
                         'month': target_date.month,
                         'day': target_date.day
                     })
+                    date_spans.append(_day_span(sentence_lower, day_name))
                     break
 
     return date_info
 
 
-def extract_all_time_mentions(sentence_lower):
-    """Extract all types of time mentions including decimal formats like 5.30, but exclude relative times"""
-    time_mentions = []
-
-    # Word-based times mapping
-    word_times = {
-        'twelve': '12', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-        'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
-        'ten': '10', 'eleven': '11', 'noon': '12', 'midnight': '0'
-    }
+def _day_span(text, word):
+    """The date span of the first occurrence of a day word in text"""
+    position = text.find(word)
+    return {'position': position, 'end_position': position + len(word), 'pattern': 'day'}
 
-    # Complex time patterns - ordered by specificity (ranges first!)
-    # Updated to handle decimal time formats like 5.30, 5.00
-    time_patterns = [
-        # Time ranges with AM/PM and decimal times: "from 5.30 to 6.30", "from 2.00 p.m. to 4.00 p.m."
-        (r'(?:from|between)\s+(\d{1,2}(?:[.:]\d{2})?\s*(?:a\.m\.|p\.m\.|am|pm)?)\s+(?:to|until|till|-)\s+(\d{1,2}(?:[.:]\d{2})?\s*(?:a\.m\.|p\.m\.|am|pm)?)',
-         'range_ampm'),
 
-        # Time ranges without AM/PM with decimal times: "from 5.30 to 6.30", "from 2.00 to 4.00"
-        (r'(?:from|between)\s+(\d{1,2}(?:[.:]\d{2})?)\s+(?:to|until|till|-)\s+(\d{1,2}(?:[.:]\d{2})?)', 'range'),
+# Word-based times mapping
+WORD_TIMES = {
+    'twelve': '12', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+    'ten': '10', 'eleven': '11', 'noon': '12', 'midnight': '0'
+}
 
-        # Full time with AM/PM and decimal times: "5.30 pm", "2.00 p.m.", "11.45 a.m."
-        (r'(\d{1,2}[.:]\d{2}\s*(?:a\.m\.|p\.m\.|am|pm))', 'full_time_ampm'),
-        (r'(\d{1,2}\s*(?:a\.m\.|p\.m\.|am|pm))', 'time_ampm'),
+# Complex time patterns - ordered by specificity (ranges first!), compiled once at import.
+# Every numeric pattern needs a digit, so sentences without one skip straight to word times.
+TIME_PATTERNS = [
+    # Time ranges with AM/PM and decimal times: "from 5.30 to 6.30", "from 2.00 p.m. to 4.00 p.m."
+    (re.compile(r'(?:from|between)\s+(\d{1,2}(?:[.:]\d{2})?\s*(?:a\.m\.|p\.m\.|am|pm)?)\s+(?:to|until|till|-)\s+(\d{1,2}(?:[.:]\d{2})?\s*(?:a\.m\.|p\.m\.|am|pm)?)'),
+     'range_ampm'),
 
-        # Decimal times without AM/PM: "5.30", "2.00", "11.45"
-        (r'(\d{1,2}[.:]\d{2})', 'decimal_time'),
+    # Time ranges without AM/PM with decimal times: "from 5.30 to 6.30", "from 2.00 to 4.00"
+    (re.compile(r'(?:from|between)\s+(\d{1,2}(?:[.:]\d{2})?)\s+(?:to|until|till|-)\s+(\d{1,2}(?:[.:]\d{2})?)'), 'range'),
 
-        # Simple times with "at" and decimal: "at 5.30", "at 2 pm", "at 2.00 p.m."
-        (r'(?:at|by)\s+(\d{1,2}(?:[.:]\d{2})?\s*(?:a\.m\.|p\.m\.|am|pm)?)', 'at_time'),
+    # Full time with AM/PM and decimal times: "5.30 pm", "2.00 p.m.", "11.45 a.m."
+    (re.compile(r'(\d{1,2}[.:]\d{2}\s*(?:a\.m\.|p\.m\.|am|pm))'), 'full_time_ampm'),
+    (re.compile(r'(\d{1,2}\s*(?:a\.m\.|p\.m\.|am|pm))'), 'time_ampm'),
 
-        # O'clock times: "3 o'clock", "12 o'clock"
-        (r'(\d{1,2})(?:\s*(?:o\'clock|oclock|clock))', 'oclock'),
+    # Decimal times without AM/PM: "5.30", "2.00", "11.45"
+    (re.compile(r'(\d{1,2}[.:]\d{2})'), 'decimal_time'),
 
-        # Standalone times (only if no decimal found): "12", "3", "2"
-        (r'(?<!\d)(\d{1,2})(?!\d|[.:])', 'standalone_time'),
-    ]
-
-    # Process each pattern
-    for pattern, pattern_type in time_patterns:
-        for match in re.finditer(pattern, sentence_lower):
-            # Skip if this is part of a relative time pattern (e.g., "in 1 hour")
-            context_before = sentence_lower[max(0, match.start() - 10):match.start()]
-            if re.search(r'in\s+\d+\s*(?:hours?|minutes?|hrs?|mins?)$', context_before):
-                continue
+    # Simple times with "at" and decimal: "at 5.30", "at 2 pm", "at 2.00 p.m."
+    (re.compile(r'(?:at|by)\s+(\d{1,2}(?:[.:]\d{2})?\s*(?:a\.m\.|p\.m\.|am|pm)?)'), 'at_time'),
 
-            # Skip if this match overlaps with a previously found time
-            is_overlap = False
-            for existing in time_mentions:
-                if (match.start() < existing['end_position'] and
-                        match.end() > existing['position']):
-                    is_overlap = True
-                    break
+    # O'clock times: "3 o'clock", "12 o'clock"
+    (re.compile(r'(\d{1,2})(?:\s*(?:o\'clock|oclock|clock))'), 'oclock'),
 
-            if not is_overlap:
-                time_data = {
-                    'position': match.start(),
-                    'end_position': match.end(),
-                    'pattern': pattern_type,
-                    'full_match': match.group(0)
-                }
-
-                # For ranges, store both start and end times
-                if pattern_type.startswith('range') and match.lastindex >= 2:
-                    time_data['time'] = match.group(1).strip()
-                    time_data['end_time'] = match.group(2).strip()
-                    time_data['type'] = 'range'
-                else:
-                    # For single times
-                    time_data['time'] = match.group(1).strip()
-                    time_data['type'] = 'single'
-
-                time_mentions.append(time_data)
+    # Standalone times (only if no decimal found): "12", "3", "2"
+    (re.compile(r'(?<!\d)(\d{1,2})(?!\d|[.:])'), 'standalone_time'),
+]
 
-    # Add word-based times (but exclude numbers that are part of relative dates or times)
-    for word, numeric in word_times.items():
-        for match in re.finditer(r'\b' + word + r'\b', sentence_lower):
-            # Skip if this is part of a relative date pattern
-            if re.search(r'in\s+\d+\s+days?', sentence_lower[match.start() - 10:match.end() + 10]):
-                continue
+# All word times in one alternation; whole words never overlap each other, so one scan finds them all
+WORD_TIME_PATTERN = re.compile(r'\b(' + '|'.join(WORD_TIMES) + r')\b')
+RELATIVE_TIME_BEFORE_PATTERN = re.compile(r'in\s+\d+\s*(?:hours?|minutes?|hrs?|mins?)$')
+RELATIVE_DAYS_PATTERN = re.compile(r'in\s+\d+\s+days?')
+DIGIT_PATTERN = re.compile(r'\d')
 
-            # Skip if this is part of a relative time pattern
-            if re.search(r'in\s+\d+\s*(?:hours?|minutes?|hrs?|mins?)$',
-                         sentence_lower[match.start() - 10:match.start()]):
-                continue
 
-            # Skip if this overlaps with existing times
-            is_overlap = False
-            for existing in time_mentions:
-                if (match.start() < existing['end_position'] and
-                        match.end() > existing['position']):
-                    is_overlap = True
-                    break
+def _claim_span(starts, ends, start, end):
+    """Claim [start, end) in the sorted, non-overlapping span index; return its slot or None if taken"""
+    # Spans are disjoint, so the only candidate for an overlap is the last span starting before `end`
+    index = bisect_left(starts, end)
+    if index > 0 and ends[index - 1] > start:
+        return None
+    starts.insert(index, start)
+    ends.insert(index, end)
+    return index
 
-            if not is_overlap:
-                time_mentions.append({
-                    'time': numeric,
-                    'position': match.start(),
-                    'end_position': match.end(),
-                    'pattern': 'word_time',
-                    'type': 'single',
-                    'full_match': match.group(0)
-                })
 
-    # Sort by position and remove any remaining duplicates
-    time_mentions.sort(key=lambda x: x['position'])
+def scan_time_matches(sentence_lower):
+    """
+    Find every candidate match of the time patterns, before any filtering.
 
-    # Remove duplicates (keep the first occurrence of each time at each position)
-    unique_mentions = []
-    seen_positions = set()
+    Returns one list of matches per pattern: the TIME_PATTERNS in priority order, then word times.
+    """
+    has_digit = DIGIT_PATTERN.search(sentence_lower)
+    matches = [list(pattern.finditer(sentence_lower)) if has_digit else [] for pattern, _ in TIME_PATTERNS]
+    matches.append(list(WORD_TIME_PATTERN.finditer(sentence_lower)))
+    return matches
 
-    for mention in time_mentions:
-        pos_key = (mention['position'], mention.get('time', ''), mention.get('end_time', ''))
-        if pos_key not in seen_positions:
-            seen_positions.add(pos_key)
-            unique_mentions.append(mention)
 
-    return unique_mentions
+def claim_time_mentions(sentence_lower, matches):
+    """Turn scan_time_matches() results into time mentions, skipping relative times and overlaps"""
+    # Accepted mentions are kept sorted by position alongside their spans, so overlap checks are bisects
+    time_mentions = []
+    starts = []
+    ends = []
 
+    # Process each pattern, highest priority first
+    for (_, pattern_type), found in zip(TIME_PATTERNS, matches):
+        for match in found:
+            # Skip if this is part of a relative time pattern (e.g., "in 1 hour")
+            if RELATIVE_TIME_BEFORE_PATTERN.search(sentence_lower, max(0, match.start() - 10), match.start()):
+                continue
 
-def extract_locations(sentence_lower, time_mentions):
-    """Extract locations with improved logic that distinguishes between time periods and locations"""
-    location_indicators = ["at", "in", "on", "near", "around", "beside"]
-    time_words = ['twelve', 'one', 'two', 'three', 'four', 'five', 'six',
-                  'seven', 'eight', 'nine', 'ten', 'eleven', 'noon', 'midnight']
+            # Skip if this match overlaps with a previously found time
+            index = _claim_span(starts, ends, match.start(), match.end())
+            if index is None:
+                continue
 
-    # Time period words that should NOT be treated as locations
-    time_period_words = ['morning', 'afternoon', 'evening', 'night', 'tonight']
+            time_data = {
+                'position': match.start(),
+                'end_position': match.end(),
+                'pattern': pattern_type,
+                'full_match': match.group(0)
+            }
+
+            # For ranges, store both start and end times
+            if pattern_type.startswith('range') and match.lastindex >= 2:
+                time_data['time'] = match.group(1).strip()
+                time_data['end_time'] = match.group(2).strip()
+                time_data['type'] = 'range'
+            else:
+                # For single times
+                time_data['time'] = match.group(1).strip()
+                time_data['type'] = 'single'
 
-    locations = []
-    words = sentence_lower.split()
+            time_mentions.insert(index, time_data)
 
-    for i, word in enumerate(words):
-        if word in location_indicators and i + 1 < len(words):
-            next_word = words[i + 1]
+    # Add word-based times (but exclude numbers that are part of relative dates or times)
+    for match in matches[-1]:
+        # Skip if this is part of a relative date pattern
+        if RELATIVE_DAYS_PATTERN.search(sentence_lower[match.start() - 10:match.end() + 10]):
+            continue
+
+        # Skip if this is part of a relative time pattern
+        if RELATIVE_TIME_BEFORE_PATTERN.search(sentence_lower, max(0, match.start() - 10), match.start()):
+            continue
+
+        # Skip if this overlaps with existing times
+        index = _claim_span(starts, ends, match.start(), match.end())
+        if index is None:
+            continue
+
+        time_mentions.insert(index, {
+            'time': WORD_TIMES[match.group(1)],
+            'position': match.start(),
+            'end_position': match.end(),
+            'pattern': 'word_time',
+            'type': 'single',
+            'full_match': match.group(0)
+        })
+
+    # Spans never overlap, so the list is already sorted by position and free of duplicates
+    return time_mentions
+
+
+def extract_all_time_mentions(sentence):
+    """Extract all types of time mentions including decimal formats like 5.30, but exclude relative times"""
+    return sentence.add('time', claim_time_mentions(sentence.text, scan_time_matches(sentence.text)))
 
-            # Skip if the next word is a time period word (e.g., "in the afternoon")
-            if next_word in time_period_words:
-                continue
 
-            # Skip if the next word is "the" followed by a time period word (e.g., "in the morning")
-            if (next_word == 'the' and i + 2 < len(words) and
-                    words[i + 2] in time_period_words):
-                continue
+# Words that end a location name: another indicator or a time word
+LOCATION_STOP_WORDS = frozenset(['at', 'in', 'on', 'near', 'around', 'beside',
+                                 'am', 'pm', 'a.m.', 'p.m.', 'to', 'from', 'until', 'and', 'then'])
+# A number right after one of these is part of a location name ("at 221", "room 101")
+LOCATION_NUMBER_PREFIXES = frozenset(['at', 'in', 'on', 'room', 'building', 'floor', 'apt', 'apartment'])
+# Dropped from the end of a location name ("at joe's the" -> "joe's")
+TRAILING_ARTICLES = frozenset(['the', 'a', 'an', 'my', 'your', 'our'])
 
-            # Skip if the next word is a time-related word or number (unless it's part of a location name)
-            if (next_word in time_words or
-                    (next_word.replace('.', '').isdigit() and not is_part_of_location(sentence_lower, i)) or
-                    'am' in next_word or 'pm' in next_word or 'a.m.' in next_word or 'p.m.' in next_word):
-                continue
 
-            location_words = []
-            j = i + 1
+def ends_location(words, j):
+    """Whether words[j] ends a location name: an indicator, a time word or a number of its own"""
+    word = words[j]
+    return word in LOCATION_STOPS or (word.replace('.', '').isdigit() and words[j - 1] not in LOCATION_NUMBER_PREFIXES)
 
-            # Collect location words until we hit another indicator or time word
-            while (j < len(words) and
-                   words[j] not in location_indicators + ['am', 'pm', 'a.m.', 'p.m.', 'to', 'from', 'until', 'and',
-                                                          'then'] and
-                   not (words[j].replace('.', '').isdigit() and not is_part_of_location(sentence_lower, j)) and
-                   words[j] not in time_words and
-                   words[j] not in time_period_words):  # Also stop at time period words
-                location_words.append(words[j])
-                j += 1
 
-            if location_words:
-                location = " ".join(location_words)
-                # Clean up the location (remove trailing prepositions, etc.)
-                location = re.sub(r'\s+(the|a|an|my|your|our)$', '', location)
+def extract_locations(sentence):
+    """
+    Extract locations with improved logic that distinguishes between time periods and locations.
 
-                # Additional check: make sure this isn't actually a time period phrase
-                if not any(period in location for period in time_period_words):
-                    locations.append(location)
+    Each location is a dict with the 'location' text, its character span ('position', 'end_position')
+    and its word span ('token_start', 'token_end').
+    """
+    words = sentence.words
+    spans = []
+    for i, word in enumerate(words):
+        if word in INDICATOR_WORDS:
+            span, _ = scan_location_at(words, i)
+            if span is not None:
+                spans.append(span)
 
-    return locations
+    return sentence.add('location', [location_mention(sentence, *span) for span in spans])
 
 
-def is_part_of_location(sentence_lower, word_index):
-    """Check if a word at given index is part of a location name"""
-    words = sentence_lower.split()
-    if word_index >= len(words):
-        return False
+def location_mention(sentence, token_start, token_end):
+    """The location mention covering sentence.words[token_start:token_end]"""
+    starts, ends = sentence.offsets()
+    return {
+        'location': " ".join(sentence.words[token_start:token_end]),
+        'position': starts[token_start],
+        'end_position': ends[token_end - 1],
+        'token_start': token_start,
+        'token_end': token_end
+    }
 
-    # If the word is a number and is preceded by a location indicator, it's likely part of a location
-    if word_index > 0 and words[word_index - 1] in ['at', 'in', 'on']:
-        return True
 
-    # If the word is a number and is part of a known location pattern (like "Room 101")
-    if word_index > 0 and words[word_index - 1] in ['room', 'building', 'floor', 'apt', 'apartment']:
-        return True
+def scan_location_at(words, i):
+    """
+    The word span (start, end) of the location introduced by words[i], if it is a location indicator.
 
-    return False
+    Returns (span or None, index of the last word looked at); an index of len(words) means the
+    result depended on where the sentence ends.
+    """
+    if words[i] not in INDICATOR_WORDS:
+        return None, i
+    if i + 1 >= len(words):
+        return None, len(words)
+
+    next_word = words[i + 1]
+
+    # Skip if the next word is a time period word (e.g., "in the afternoon")
+    if next_word in PERIOD_WORDS:
+        return None, i + 1
+
+    # Skip if the next word is "the" followed by a time period word (e.g., "in the morning")
+    if next_word == 'the':
+        if i + 2 >= len(words):
+            examined = len(words)
+        elif words[i + 2] in PERIOD_WORDS:
+            return None, i + 2
+        else:
+            examined = i + 2
+    else:
+        examined = i + 1
+
+    # Skip if the next word is a time-related word or number (unless it's part of a location name)
+    if (next_word in WORD_TIMES or (next_word.replace('.', '').isdigit() and (i == 0 or words[i - 1] not in LOCATION_NUMBER_PREFIXES)) or
+            'am' in next_word or 'pm' in next_word or 'a.m.' in next_word or 'p.m.' in next_word):
+        return None, examined
+
+    # Collect location words until we hit another indicator or time word
+    j = i + 1
+    while j < len(words) and not ends_location(words, j):
+        j += 1
+    examined = max(examined, j)
+
+    end = j
+    if end - (i + 1) >= 2 and words[end - 1] in TRAILING_ARTICLES:
+        end -= 1
+    if end == i + 1:
+        return None, examined
+
+    # Additional check: make sure this isn't actually a time period phrase
+    location = " ".join(words[i + 1:end])
+    if any(period in location for period in TIME_PERIOD_WORDS):
+        return None, examined
+    return (i + 1, end), examined
 
 
 def parse_time_string(time_str, default_minute=0, context_am_pm=None):
@@ -547,11 +820,11 @@ def parse_time_string(time_str, default_minute=0, context_am_pm=None):
     hour = None
     minute = default_minute
 
-    # Handle AM/PM with and without periods
-    is_pm = ('p.m.' in time_str.lower() or 'pm' in time_str.lower() or
-             context_am_pm == 'pm')
-    is_am = ('a.m.' in time_str.lower() or 'am' in time_str.lower() or
-             context_am_pm == 'am')
+    # Handle AM/PM with and without periods; one written in the time beats the time period context
+    written_pm = 'p.m.' in time_str.lower() or 'pm' in time_str.lower()
+    written_am = 'a.m.' in time_str.lower() or 'am' in time_str.lower()
+    is_pm = written_pm or (context_am_pm == 'pm' and not written_am)
+    is_am = written_am or (context_am_pm == 'am' and not written_pm)
 
     # Clean the time string (remove AM/PM but keep the original for processing)
     time_str_clean = re.sub(r'\s*(a\.m\.|p\.m\.|am|pm)', '', time_str.lower()).strip()
@@ -590,44 +863,48 @@ def parse_time_string(time_str, default_minute=0, context_am_pm=None):
     return hour, minute
 
 
-def create_events_with_datetime(sentence_lower, time_mentions, date_info, location_mentions, activity, reference_date):
+def create_events_with_datetime(sentence, date_info, activity, reference_date):
     """Create events with detailed datetime attributes"""
     events = []
+    time_mentions = sentence.get('time')
+    location_mentions = sentence.get('location')
 
     if not time_mentions:
         # If no times found, create one event for the date with default times
         if activity:
-            event = Event(
-                activity=activity,
-                start_year=date_info['year'],
-                start_month=date_info['month'],
-                start_day=date_info['day'],
-                start_hour=9,
-                start_minute=0,
-                end_year=date_info['year'],
-                end_month=date_info['month'],
-                end_day=date_info['day'],
-                end_hour=10,
-                end_minute=0
-            )
+            try:
+                event = Event(
+                    activity=activity,
+                    start_year=date_info['year'],
+                    start_month=date_info['month'],
+                    start_day=date_info['day'],
+                    start_hour=9,
+                    start_minute=0,
+                    end_year=date_info['year'],
+                    end_month=date_info['month'],
+                    end_day=date_info['day'],
+                    end_hour=10,
+                    end_minute=0
+                )
+            except ValueError:
+                return events  # Not a real calendar date (e.g. "31 november")
             if location_mentions:
-                event.location = location_mentions[0]
+                event.location = location_mentions[0]['location']
             events.append(event)
         return events
 
-    # Create events for each time mention
-    for i, time_mention in enumerate(time_mentions):
+    # Create events for each time mention, remembering which mention each event came from
+    event_mentions = []
+    for time_mention in time_mentions:
         if activity:
-            # Detect time period context for this time mention
-            time_period = detect_time_period(sentence_lower, time_mention)
-
             if time_mention['type'] == 'range':
                 # Detect time period for start and end times separately
-                start_period = detect_time_period(sentence_lower, {
-                    'position': time_mention['position'],
-                    'end_position': time_mention['position'] + len(time_mention['time'])
+                start_position = sentence.text.find(time_mention['time'], time_mention['position'])
+                start_period = detect_time_period(sentence, {
+                    'position': start_position,
+                    'end_position': start_position + len(time_mention['time'])
                 })
-                end_period = detect_time_period(sentence_lower, {
+                end_period = detect_time_period(sentence, {
                     'position': time_mention['end_position'] - len(time_mention['end_time']),
                     'end_position': time_mention['end_position']
                 })
@@ -635,112 +912,197 @@ def create_events_with_datetime(sentence_lower, time_mentions, date_info, locati
                 start_hour, start_minute = parse_time_string(time_mention['time'], context_am_pm=start_period)
                 end_hour, end_minute = parse_time_string(time_mention['end_time'], context_am_pm=end_period)
             else:
-                # For single times, use the detected time period
+                # For single times, use the time period context of the whole mention
+                time_period = detect_time_period(sentence, time_mention)
                 start_hour, start_minute = parse_time_string(time_mention['time'], context_am_pm=time_period)
                 end_hour = (start_hour + 1) % 24 if start_hour is not None else None
                 end_minute = start_minute
 
             if start_hour is not None and end_hour is not None:
-                event = Event(
-                    activity=activity,
-                    start_year=date_info['year'],
-                    start_month=date_info['month'],
-                    start_day=date_info['day'],
-                    start_hour=start_hour,
-                    start_minute=start_minute,
-                    end_year=date_info['year'],
-                    end_month=date_info['month'],
-                    end_day=date_info['day'],
-                    end_hour=end_hour,
-                    end_minute=end_minute
-                )
-
-                if i < len(location_mentions):
-                    event.location = location_mentions[i]
+                try:
+                    event = Event(
+                        activity=activity,
+                        start_year=date_info['year'],
+                        start_month=date_info['month'],
+                        start_day=date_info['day'],
+                        start_hour=start_hour,
+                        start_minute=start_minute,
+                        end_year=date_info['year'],
+                        end_month=date_info['month'],
+                        end_day=date_info['day'],
+                        end_hour=end_hour,
+                        end_minute=end_minute
+                    )
+                except ValueError:
+                    continue  # Not a real clock time or date (e.g. "25", "5.75", "31 november")
 
                 events.append(event)
+                event_mentions.append(time_mention)
+
+    # Each location goes to the event of the time mention it belongs to, not to the event in its place
+    for event, location in zip(events, pair_locations(event_mentions, location_mentions)):
+        if location is not None:
+            event.location = location['location']
 
     return events
 
 
-def extract_clean_activity_full(sentence_lower, date_info, location_mentions, time_mentions):
-    """Extract clean activity text by removing ALL non-activity components including locations and relative dates"""
-    # Start with the original sentence
-    cleaned = sentence_lower
-
-    # Remove relative date patterns first
-    relative_patterns = [
-        r'in\s+\d+\s+days?',
-        r'in\s+\d+\s+weeks?',
-        r'in\s+\d+\s+months?',
-    ]
+def _gap(a, b):
+    """Characters between two spans, 0 if they touch or overlap"""
+    return max(0, b['position'] - a['end_position'], a['position'] - b['end_position'])
 
-    # Remove relative time patterns
-    relative_time_patterns = [
-        r'in\s+\d+\s+hours?',
-        r'in\s+\d+\s+minutes?',
-        r'in\s+\d+\s+hrs?',
-        r'in\s+\d+\s+mins?',
-    ]
 
-    for pattern in relative_patterns + relative_time_patterns:
-        cleaned = re.sub(pattern, '', cleaned)
+def pair_locations(time_mentions, location_mentions):
+    """
+    The location of each time mention, or None.
 
-    # Remove locations
+    A location belongs to the time mention nearest to it (the earlier one on a tie); a time
+    mention with several locations keeps the first.
+    """
+    paired = [None] * len(time_mentions)
+    if not time_mentions:
+        return paired
     for location in location_mentions:
-        # Remove the location from the sentence
-        cleaned = re.sub(r'\b' + re.escape(location) + r'\b', '', cleaned)
-
-    # Remove time mentions (including decimal times and AM/PM formats)
-    for time_mention in time_mentions:
-        cleaned = re.sub(re.escape(time_mention['full_match']), '', cleaned)
-
-    # Days of week to remove
-    days_of_week = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-
-    # Months to remove
-    months = ['january', 'february', 'march', 'april', 'may', 'june',
-              'july', 'august', 'september', 'october', 'november', 'december']
-
-    # Relative dates to remove
-    relative_dates = ['today', 'tomorrow', 'tmrw']
-
-    # Time indicators to remove (including AM/PM formats)
-    time_indicators = ['at', 'from', 'to', 'until', 'till', 'by', 'around', 'about', 'starting',
-                       'am', 'pm', 'a.m.', 'p.m.']
-
-    # Location indicators to remove
-    location_indicators = ['at', 'in', 'on', 'near', 'around', 'beside']
-
-    # Time period words to remove
-    time_period_words = ['morning', 'afternoon', 'evening', 'night', 'tonight']
-
-    # Common introductory phrases to remove
-    intro_phrases = ['i have', 'i need', 'i want', "let's", 'we have', 'there is', "there's",
-                     'schedule', 'plan', 'add', 'can you', 'please', 'could you', 'would you',
-                     'i am', 'i will', 'i am going to', 'going to']
-
-    # Articles and common words to remove
-    common_words = ['a', 'an', 'the', 'my', 'your', 'our', 'their', 'some', 'any', 'am', 'will']
+        distances = [_gap(mention, location) for mention in time_mentions]
+        i = distances.index(min(distances))
+        if paired[i] is None:
+            paired[i] = location
+    return paired
+
+
+# Relative date and time offsets ("in 3 days", "in 30 minutes"), compiled once at import
+RELATIVE_OFFSET_PATTERNS = [(re.compile(pattern), pattern_type) for pattern, pattern_type in (
+    (r'in\s+(\d+)\s+days?', 'days'),
+    (r'in\s+(\d+)\s+weeks?', 'weeks'),
+    (r'in\s+(\d+)\s+months?', 'months'),
+    (r'in\s+(\d+)\s+hours?', 'hours'),
+    (r'in\s+(\d+)\s+minutes?', 'minutes'),
+    (r'in\s+(\d+)\s+hrs?', 'hrs'),
+    (r'in\s+(\d+)\s+mins?', 'mins'),
+)]
+# Every offset pattern needs this prefix, so most sentences skip the offset scans entirely
+RELATIVE_OFFSET_HINT = re.compile(r'in\s+\d+\s+')
+
+
+def scan_relative_offsets(sentence_lower):
+    """Every match of every relative offset pattern, sorted by position (the 'offset' spans)"""
+    if not RELATIVE_OFFSET_HINT.search(sentence_lower):
+        return []
+    offsets = [{'position': match.start(), 'end_position': match.end(), 'pattern': pattern_type,
+                'amount': int(match.group(1))}
+               for pattern, pattern_type in RELATIVE_OFFSET_PATTERNS for match in pattern.finditer(sentence_lower)]
+    offsets.sort(key=itemgetter('position'))
+    return offsets
+
+
+# Time period words and the half of the day they imply; "this morning" is found through "morning".
+# A period word has to start a word, so "midnight" and "fortnight" are not nights.
+PERIOD_AM_PM = {'morning': 'am', 'afternoon': 'pm', 'evening': 'pm', 'tonight': 'pm', 'night': 'pm'}
+PERIOD_PATTERN = re.compile(r'\b(?:' + '|'.join(PERIOD_AM_PM) + r')')
+
+
+def scan_periods(sentence_lower):
+    """Every time period word, sorted by position (the 'period' spans)"""
+    return [{'position': match.start(), 'end_position': match.end(), 'am_pm': PERIOD_AM_PM[match.group()]}
+            for match in PERIOD_PATTERN.finditer(sentence_lower)]
+
+
+# Span kinds AnnotatedSentence.get() scans from the text on first use
+LEXICAL_SCANNERS = {
+    'offset': scan_relative_offsets,
+    'period': scan_periods,
+}
+
+# Days of week to remove
+DAYS_OF_WEEK = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Months to remove
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june',
+          'july', 'august', 'september', 'october', 'november', 'december']
+
+# Relative dates to remove
+RELATIVE_DATES = ['today', 'tomorrow', 'tmrw']
+
+# Time indicators to remove (including AM/PM formats)
+TIME_INDICATORS = ['at', 'from', 'to', 'until', 'till', 'by', 'around', 'about', 'starting',
+                   'am', 'pm', 'a.m.', 'p.m.']
+
+# Location indicators to remove
+LOCATION_INDICATORS = ['at', 'in', 'on', 'near', 'around', 'beside']
+
+# Time period words to remove
+TIME_PERIOD_WORDS = ['morning', 'afternoon', 'evening', 'night', 'tonight']
+
+# Set versions for per-word lookups
+INDICATOR_WORDS = frozenset(LOCATION_INDICATORS)
+PERIOD_WORDS = frozenset(TIME_PERIOD_WORDS)
+LOCATION_STOPS = LOCATION_STOP_WORDS | frozenset(WORD_TIMES) | PERIOD_WORDS
+
+# Common introductory phrases to remove
+INTRO_PHRASES = ['i have', 'i need', 'i want', "let's", 'we have', 'there is', "there's",
+                 'schedule', 'plan', 'add', 'can you', 'please', 'could you', 'would you',
+                 'i am', 'i will', 'i am going to', 'going to']
+
+# Articles and common words to remove
+COMMON_WORDS = ['a', 'an', 'the', 'my', 'your', 'our', 'their', 'some', 'any', 'am', 'will']
+
+
+def _build_stop_phrase_passes():
+    """Compile the stop-phrase removal passes used by extract_clean_activity_full"""
+    all_words_to_remove = (DAYS_OF_WEEK + MONTHS + RELATIVE_DATES +
+                           TIME_INDICATORS + LOCATION_INDICATORS + COMMON_WORDS +
+                           TIME_PERIOD_WORDS)
+
+    # 'a.m.' and 'p.m.' are regexes (the dots match any character) whose word boundaries depend on
+    # the words removed before them, so they keep their own passes at their original place in the order.
+    # Plain words and intro phrases only ever remove whole words, so each group collapses into one alternation.
+    passes = []
+    group = list(INTRO_PHRASES)
+    for word in all_words_to_remove:
+        if word in ('a.m.', 'p.m.'):
+            passes.append(group)
+            passes.append([word])
+            group = []
+        else:
+            group.append(word)
+    passes.append(group)
 
-    # Remove introductory phrases first
-    for phrase in intro_phrases:
-        cleaned = re.sub(r'\b' + phrase + r'\b', '', cleaned)
+    return [re.compile(r'\b(?:' + '|'.join(words) + r')\b') for words in passes if words]
 
-    # Remove all the identified words
-    all_words_to_remove = (days_of_week + months + relative_dates +
-                           time_indicators + location_indicators + common_words +
-                           time_period_words)
 
-    for word in all_words_to_remove:
-        cleaned = re.sub(r'\b' + word + r'\b', '', cleaned)
+STOP_PHRASE_PASSES = _build_stop_phrase_passes()
+PUNCTUATION_TABLE = str.maketrans('', '', '.,!?;')
 
-    # Clean up: remove punctuation and extra spaces
-    cleaned = re.sub(r'[.,!?;]', '', cleaned)
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
 
-    # Split and filter words - only keep meaningful activity words
-    words = cleaned.split()
+def extract_clean_activity_full(sentence):
+    """Extract clean activity text by removing ALL non-activity components including locations and relative dates"""
+    return strip_stop_phrases(cut_mentions(sentence))
+
+
+def cut_mentions(sentence):
+    """The sentence text with its locations, relative offsets and times cut out where they were found"""
+    sentence_lower = sentence.text
+    cuts = sorted(sentence.get('location') + sentence.get('offset') + sentence.get('time'),
+                  key=itemgetter('position'))
+    pieces = []
+    last = 0
+    for cut in cuts:
+        # Offsets can overlap ("in 5 minutes" and "in 5 min"), so only the part past the last cut is new
+        if cut['position'] > last:
+            pieces.append(sentence_lower[last:cut['position']])
+        last = max(last, cut['end_position'])
+    pieces.append(sentence_lower[last:])
+    return ''.join(pieces)
+
+
+def strip_stop_phrases(cleaned):
+    """The activity words left once intro phrases, date/time/location words, punctuation and numbers are gone"""
+    # Remove introductory phrases first, then all the identified words
+    for pattern in STOP_PHRASE_PASSES:
+        cleaned = pattern.sub('', cleaned)
+
+    # Clean up: remove punctuation, then split and filter words - only keep meaningful activity words
+    words = cleaned.translate(PUNCTUATION_TABLE).split()
     filtered_words = []
 
     for word in words:
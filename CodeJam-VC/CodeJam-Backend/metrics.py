@@ -0,0 +1,179 @@
+"""
+Timing spans and Prometheus-style metrics for the upload pipeline and the parser.
+
+    with span("upload.transcribe"):
+        ...
+
+records how long the block took in the voicecal_stage_seconds histogram and, inside a
+request_trace(), in that request's structured timing log line. render() returns every
+metric in the Prometheus text exposition format for the /metrics endpoint.
+
+Tracing is off until enable() is called; while off, span() hands back one shared no-op
+context manager and request_trace() records nothing, so instrumented code costs next to
+nothing.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+logger = logging.getLogger("voicecal.timing")
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = False
+_NOOP_SPAN = nullcontext()
+# Stage timings of the request being handled, shared with worker threads through the context
+_current_trace = ContextVar("voicecal_current_trace", default=None)
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(counts)) for labels, counts in self._values.items())
+        for labels, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, [("le", bound)])
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {counts[-1]}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("voicecal_stage_seconds", "Time spent in each pipeline stage.", ("stage",))
+REQUEST_SECONDS = Histogram("voicecal_request_seconds", "Total time to handle a request.", ("endpoint",))
+REQUESTS = Counter("voicecal_requests_total", "Requests handled, by endpoint and outcome.", ("endpoint", "status"))
+
+REGISTRY = [STAGE_SECONDS, REQUEST_SECONDS, REQUESTS]
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe((self.name,), elapsed)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace[self.name] = trace.get(self.name, 0.0) + elapsed
+        return False
+
+
+def span(name):
+    """Time a block as pipeline stage `name` (a shared no-op while tracing is off)"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name)
+
+
+@contextmanager
+def request_trace(endpoint, **fields):
+    """
+    Collect the spans of one request and, at the end, log them as one JSON line on the
+    voicecal.timing logger together with the total time, outcome and any extra fields.
+    """
+    if not _enabled:
+        yield None
+        return
+
+    trace = {}
+    token = _current_trace.set(trace)
+    status = "ok"
+    start = time.perf_counter()
+    try:
+        yield trace
+    except BaseException as exc:
+        status = type(exc).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_trace.reset(token)
+        REQUEST_SECONDS.observe((endpoint,), elapsed)
+        REQUESTS.inc((endpoint, status))
+        logger.info(json.dumps({
+            "endpoint": endpoint,
+            "status": status,
+            "total_ms": round(elapsed * 1000, 3),
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in trace.items()},
+            **fields
+        }))
@@ -0,0 +1,74 @@
+"""
+Transcription model replicas shared by the request handlers.
+
+Each uvicorn worker owns one ModelPool. Replicas are loaded either at startup (eager) or
+the first time a request needs one (lazy), and each freshly loaded replica runs a short
+warmup transcription so the first real request does not pay for kernel setup and cold caches.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from audio import SAMPLE_RATE
+from transcription_backends import load_backend
+
+
+class ModelPool:
+    def __init__(self, model_name="small.en", replicas=1, eager=True, warmup=True, backend="whisper",
+                 backend_options=None):
+        self.model_name = model_name
+        self.backend = backend
+        self.backend_options = backend_options or {}
+        self.replicas = max(1, replicas)
+        self.eager = eager
+        self.warmup = warmup
+        self._idle = queue.Queue()
+        self._loaded = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Load and warm every replica now if the pool is eager; lazy pools load on demand"""
+        if self.eager:
+            while self._reserve_slot():
+                self._idle.put(self._load_replica())
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._loaded >= self.replicas:
+                return False
+            self._loaded += 1
+            return True
+
+    def _load_replica(self):
+        try:
+            model = load_backend(self.backend, self.model_name, **self.backend_options)
+            if self.warmup:
+                # One second of silence runs the encoder and a decoder pass end to end
+                model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+        except Exception:
+            with self._lock:
+                self._loaded -= 1
+            raise
+        return model
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """Borrow a replica for the duration of the with-block, waiting up to timeout seconds for one"""
+        try:
+            model = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                model = self._load_replica()
+            else:
+                model = self._idle.get(timeout=timeout)
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+    def transcribe(self, audio, **kwargs):
+        """Run model.transcribe on whichever replica is free next"""
+        with self.acquire() as model:
+            return model.transcribe(audio, **kwargs)
@@ -0,0 +1,93 @@
+"""
+Bounded LRU cache in front of parse_schedule_to_events.
+
+Users repeat the same commands ("gym tomorrow at 7", "standup at 9.30"), so results are
+cached by the normalized sentence plus the reference date, reduced to the precision the
+parser reads from it (see main.reference_date_key).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from main import parse_schedule_to_events, reference_date_key
+
+
+def normalize_sentence(sentence):
+    """Lowercase and collapse whitespace, so ' Gym  tomorrow at 7' and 'gym tomorrow at 7' share an entry"""
+    return " ".join(sentence.lower().split())
+
+
+class ParseCache:
+    def __init__(self, maxsize=1024, ttl=None, executor=None):
+        """
+        Keep up to maxsize parses, each for at most ttl seconds (None or 0 means forever).
+        Misses hand long dictations to executor clause by clause, if one is given.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self.executor = executor
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, sentence, reference_date=None):
+        """
+        Return parse_schedule_to_events(normalized sentence, reference_date), from the cache when possible.
+
+        Cache misses parse the normalized sentence too, so a hit and a miss always give the same events.
+        Each call gets its own copies of the cached events.
+        """
+        if reference_date is None:
+            reference_date = datetime.now()
+
+        sentence = normalize_sentence(sentence)
+        if self.maxsize <= 0:
+            return parse_schedule_to_events(sentence, reference_date, self.executor)
+
+        key = (sentence, reference_date_key(sentence, reference_date))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, events = entry
+                if expires_at is None or now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return [copy.copy(event) for event in events]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        events = parse_schedule_to_events(sentence, reference_date, self.executor)
+        expires_at = now + self.ttl if self.ttl else None
+
+        with self._lock:
+            self._entries[key] = (expires_at, tuple(copy.copy(event) for event in events))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return events
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters and current size, e.g. for logging or a status endpoint"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,83 @@
+"""
+Incremental transcription for audio that is still being recorded.
+
+A StreamingTranscriber is fed encoded chunks as the browser records them. Whenever at least
+step_seconds of new audio has arrived (and no transcription is already running) it
+re-transcribes the audio that is not yet committed and reports a partial transcript. Audio
+longer than Whisper's 30 second window is handled with a sliding window: every segment but
+the last of a full window is committed as final text, and the window moves to where the
+last segment starts. finish() transcribes whatever is left and returns the full text.
+"""
+import asyncio
+
+from audio import SAMPLE_RATE, PcmStream
+from executors import ExecutorSaturated
+
+
+class StreamingTranscriber:
+    def __init__(self, transcribe, on_partial, window_seconds=30, step_seconds=1.0, max_seconds=300):
+        """
+        transcribe: async callable taking a float32 waveform and returning a Whisper result dict
+        on_partial: async callable receiving each partial transcript
+        """
+        self.transcribe = transcribe
+        self.on_partial = on_partial
+        self.window_samples = int(window_seconds * SAMPLE_RATE)
+        self.step_seconds = step_seconds
+        self.stream = PcmStream(max_seconds=max_seconds)
+        self._committed = ""
+        self._offset = 0
+        self._transcribed_until = 0.0
+        self._partial_task = None
+
+    async def start(self):
+        await self.stream.start()
+
+    async def add_chunk(self, chunk):
+        """Feed the next encoded chunk, starting a partial transcription if one is due"""
+        await self.stream.write(chunk)
+
+        due = self.stream.duration - self._transcribed_until >= self.step_seconds
+        idle = self._partial_task is None or self._partial_task.done()
+        if due and idle:
+            self._transcribed_until = self.stream.duration
+            self._partial_task = asyncio.ensure_future(self._publish_partial())
+
+    async def _publish_partial(self):
+        try:
+            text = await self._transcribe_pending(self.stream.samples())
+        except ExecutorSaturated:
+            return  # The server is busy; skip this preview and try again on the next step
+        await self.on_partial(text)
+
+    async def _transcribe_pending(self, audio):
+        """Commit full windows of audio, then transcribe the remainder; returns the text so far"""
+        while len(audio) - self._offset > self.window_samples:
+            result = await self.transcribe(audio[self._offset:self._offset + self.window_samples])
+            segments = result["segments"]
+
+            # The last segment may be cut off by the window edge, so it is transcribed again next time
+            advance = int(segments[-1]["start"] * SAMPLE_RATE) if len(segments) > 1 else 0
+            if advance > 0:
+                segments = segments[:-1]
+            else:
+                advance = self.window_samples
+
+            self._committed += "".join(segment["text"] for segment in segments)
+            self._offset += advance
+
+        result = await self.transcribe(audio[self._offset:])
+        return (self._committed + result["text"]).strip()
+
+    async def finish(self):
+        """Decode the rest of the stream and return the final transcript"""
+        audio = await self.stream.finish()
+        if self._partial_task is not None:
+            # Let the running preview finish; it may commit windows the final pass then skips
+            await asyncio.gather(self._partial_task, return_exceptions=True)
+        return await self._transcribe_pending(audio)
+
+    async def close(self):
+        if self._partial_task is not None:
+            self._partial_task.cancel()
+        await self.stream.close()
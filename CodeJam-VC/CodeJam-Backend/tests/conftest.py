@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import threading
+from email.parser import Parser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The backend modules import each other by their flat names, as they do when run from CodeJam-Backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BOUNDARY = "stub_batch_boundary"
+
+
+class CalendarStub:
+    """
+    A local stand-in for the Calendar API: batch inserts at /batch/calendar/v3 and OAuth token
+    refreshes at /token.
+
+    statuses lists the HTTP status for each upcoming batch item, in order (200 once it runs out);
+    token_statuses does the same for token refreshes.
+    """
+
+    def __init__(self):
+        self.statuses = []
+        self.token_statuses = []
+        self.events = []
+        self.batches = []
+        self.refreshes = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.endpoint = f"http://127.0.0.1:{self.server.server_port}/"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _next_status(self, statuses):
+        with self.lock:
+            return statuses.pop(0) if statuses else 200
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                if self.path == "/token":
+                    self._token()
+                elif self.path == "/batch/calendar/v3":
+                    self._batch(body)
+                else:
+                    self._reply(404, "application/json", "{}")
+
+            def _token(self):
+                status = stub._next_status(stub.token_statuses)
+                if status != 200:
+                    self._reply(status, "application/json", json.dumps({"error": "invalid_grant"}))
+                    return
+                with stub.lock:
+                    stub.refreshes += 1
+                    token = f"token-{stub.refreshes}"
+                self._reply(200, "application/json", json.dumps({"access_token": token, "expires_in": 3600}))
+
+            def _batch(self, body):
+                message = Parser().parsestr(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n{body}")
+                with stub.lock:
+                    stub.batches.append({"authorization": self.headers.get("Authorization"),
+                                         "size": len(message.get_payload())})
+                parts = []
+                for part in message.get_payload():
+                    request = part.get_payload().replace("\r\n", "\n")
+                    event = json.loads(request.split("\n\n", 1)[1])
+                    status = stub._next_status(stub.statuses)
+                    if status == 200:
+                        with stub.lock:
+                            stub.events.append(event)
+                            link = f"{stub.endpoint}event?eid={len(stub.events)}"
+                        content = json.dumps({"htmlLink": link, "summary": event.get("summary")})
+                    else:
+                        content = json.dumps({"error": {"code": status, "message": "stub failure"}})
+                    parts.append(
+                        f"--{BOUNDARY}\r\nContent-Type: application/http\r\n"
+                        f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                        f"HTTP/1.1 {status} Stub\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n"
+                        f"{content}\r\n"
+                    )
+                self._reply(200, f"multipart/mixed; boundary={BOUNDARY}", "".join(parts) + f"--{BOUNDARY}--\r\n")
+
+            def _reply(self, status, content_type, text):
+                data = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+@pytest.fixture
+def calendar_stub():
+    stub = CalendarStub()
+    yield stub
+    stub.close()
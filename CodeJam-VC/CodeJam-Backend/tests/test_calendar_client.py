@@ -0,0 +1,89 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from google.auth.credentials import AnonymousCredentials
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+from calendar_client import CalendarClientPool
+from calendar_writer import CalendarWriter
+
+BODY = {
+    "summary": "gym",
+    "start": {"dateTime": "2025-11-17T09:00:00", "timeZone": "America/Toronto"},
+    "end": {"dateTime": "2025-11-17T10:00:00", "timeZone": "America/Toronto"},
+}
+
+
+def user_credentials(stub, expires_in):
+    # google-auth keeps expiry as a naive UTC datetime
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=expires_in)
+    return Credentials("stale", refresh_token="refresh", token_uri=f"{stub.endpoint}token",
+                       client_id="client", client_secret="secret", expiry=expiry)
+
+
+def test_each_thread_reuses_its_own_service(calendar_stub):
+    clients = CalendarClientPool(AnonymousCredentials(), api_endpoint=calendar_stub.endpoint)
+    services = []
+    thread = threading.Thread(target=lambda: services.extend([clients.service(), clients.service()]))
+    thread.start()
+    thread.join()
+
+    assert clients.service() is clients.service()
+    assert services[0] is services[1]
+    assert services[0] is not clients.service()
+    assert clients.stats() == {"clients": 2, "refreshes": 0}
+    clients.close()
+
+
+def test_token_is_refreshed_before_it_expires(calendar_stub, tmp_path):
+    token_path = tmp_path / "token.json"
+    # Still valid as far as google-auth is concerned, but inside the pool's refresh margin
+    clients = CalendarClientPool(user_credentials(calendar_stub, 400), api_endpoint=calendar_stub.endpoint,
+                                 token_path=str(token_path), refresh_margin=600)
+    writer = CalendarWriter(clients, window=0.01)
+    try:
+        writer.insert_many([BODY], timeout=10)
+        writer.insert_many([BODY], timeout=10)
+    finally:
+        writer.close()
+        clients.close()
+
+    assert calendar_stub.refreshes == 1
+    assert [batch["authorization"] for batch in calendar_stub.batches] == ["Bearer token-1", "Bearer token-1"]
+    assert json.loads(token_path.read_text())["token"] == "token-1"
+
+
+def test_token_far_from_expiry_is_not_refreshed(calendar_stub):
+    clients = CalendarClientPool(user_credentials(calendar_stub, 3600), api_endpoint=calendar_stub.endpoint,
+                                 refresh_margin=600)
+    writer = CalendarWriter(clients, window=0.01)
+    try:
+        writer.insert_many([BODY], timeout=10)
+    finally:
+        writer.close()
+        clients.close()
+
+    assert calendar_stub.refreshes == 0
+    assert calendar_stub.batches[0]["authorization"] == "Bearer stale"
+
+
+def test_failed_refresh_fails_the_batch_and_keeps_the_writer_running(calendar_stub):
+    calendar_stub.token_statuses = [400]
+    clients = CalendarClientPool(user_credentials(calendar_stub, 60), api_endpoint=calendar_stub.endpoint)
+    writer = CalendarWriter(clients, window=0.01)
+    try:
+        with pytest.raises(RefreshError):
+            writer.insert_many([BODY], timeout=10)
+        # The next batch refreshes again and goes through
+        assert writer.insert_many([BODY], timeout=10)[0].startswith(calendar_stub.endpoint)
+    finally:
+        writer.close()
+        clients.close()
+
+    assert calendar_stub.refreshes == 1
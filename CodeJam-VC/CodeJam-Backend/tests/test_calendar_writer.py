@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from google.auth.credentials import AnonymousCredentials
+
+from calendar_client import CalendarClientPool
+from calendar_writer import CalendarWriter
+
+
+def event_body(summary):
+    return {
+        "summary": summary,
+        "start": {"dateTime": "2025-11-17T09:00:00", "timeZone": "America/Toronto"},
+        "end": {"dateTime": "2025-11-17T10:00:00", "timeZone": "America/Toronto"},
+    }
+
+
+@pytest.fixture
+def writer(calendar_stub):
+    clients = CalendarClientPool(AnonymousCredentials(), api_endpoint=calendar_stub.endpoint, timeout=5)
+    writer = CalendarWriter(clients, window=0.01, max_batch=50, max_retries=3, backoff=0.01)
+    yield writer
+    writer.close()
+    clients.close()
+
+
+def test_inserts_are_batched_to_the_configured_endpoint(calendar_stub, writer):
+    links = writer.insert_many([event_body("gym"), event_body("lunch"), event_body("dinner")], timeout=10)
+
+    assert all(link.startswith(calendar_stub.endpoint) for link in links)
+    assert [event["summary"] for event in calendar_stub.events] == ["gym", "lunch", "dinner"]
+    assert [batch["size"] for batch in calendar_stub.batches] == [3]
+
+
+def test_transient_errors_are_retried(calendar_stub, writer):
+    calendar_stub.statuses = [429, 200, 503, 500]
+
+    links = writer.insert_many([event_body("gym"), event_body("lunch"), event_body("dinner")], timeout=10)
+
+    assert all(links)
+    assert sorted(event["summary"] for event in calendar_stub.events) == ["dinner", "gym", "lunch"]
+    assert len(calendar_stub.batches) >= 2
+
+
+def test_permanent_errors_fail_only_their_item(calendar_stub, writer):
+    calendar_stub.statuses = [200, 400]
+    gym = writer.submit(event_body("gym"))
+    lunch = writer.submit(event_body("lunch"))
+
+    assert gym.result(10).startswith(calendar_stub.endpoint)
+    assert lunch.exception(10).resp.status == 400
+
+
+def test_retries_give_up_after_max_retries(calendar_stub, writer):
+    calendar_stub.statuses = [503] * 4
+
+    with pytest.raises(Exception) as error:
+        writer.insert_many([event_body("gym")], timeout=10)
+
+    assert error.value.resp.status == 503
+    assert len(calendar_stub.batches) == 4
+
+
+def test_inserts_arriving_within_the_window_share_one_batch(calendar_stub):
+    clients = CalendarClientPool(AnonymousCredentials(), api_endpoint=calendar_stub.endpoint, timeout=5)
+    writer = CalendarWriter(clients, window=0.2, max_batch=50)
+    try:
+        futures = []
+        for i in range(8):
+            futures.append(writer.submit(event_body(f"event {i}")))
+            time.sleep(0.005)
+        assert all(future.result(10) for future in futures)
+    finally:
+        writer.close()
+        clients.close()
+
+    assert [batch["size"] for batch in calendar_stub.batches] == [8]
+
+
+def test_a_full_batch_is_sent_without_waiting_for_the_window(calendar_stub):
+    clients = CalendarClientPool(AnonymousCredentials(), api_endpoint=calendar_stub.endpoint, timeout=5)
+    writer = CalendarWriter(clients, window=30, max_batch=3)
+    try:
+        futures = [writer.submit(event_body(f"event {i}")) for i in range(3)]
+        assert all(future.result(10) for future in futures)
+    finally:
+        writer.close()
+        clients.close()
+
+    assert [batch["size"] for batch in calendar_stub.batches] == [3]
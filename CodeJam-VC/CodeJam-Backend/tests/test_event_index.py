@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+import pytest
+
+import event_index
+from event_index import DedupInserter, MemoryEventIndex, SQLiteEventIndex, event_fingerprint
+
+GYM = {"activity": "Gym", "location": None, "start_year": 2026, "start_month": 10, "start_day": 18,
+       "start_hour": 7, "start_minute": 0, "end_year": 2026, "end_month": 10, "end_day": 18,
+       "end_hour": 8, "end_minute": 0}
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(event_index.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, tmp_path):
+    if request.param == "memory":
+        index = MemoryEventIndex(window=60)
+    else:
+        index = SQLiteEventIndex(str(tmp_path / "events.sqlite3"), window=60)
+    yield index
+    index.close()
+
+
+class Submitter:
+    """Stands in for CalendarWriter.submit: futures stay open until the test finishes them"""
+
+    def __init__(self):
+        self.bodies = []
+        self.futures = []
+        self.submitted = threading.Event()
+
+    def __call__(self, body):
+        future = Future()
+        self.bodies.append(body)
+        self.futures.append(future)
+        self.submitted.set()
+        return future
+
+
+def test_fingerprint_ignores_case_and_spacing():
+    assert event_fingerprint(GYM) == event_fingerprint(dict(GYM, activity="  gym "))
+    assert event_fingerprint(GYM) != event_fingerprint(dict(GYM, start_hour=9))
+
+
+def test_events_are_duplicates_only_within_the_window(index, clock):
+    index.put("gym", "link-1")
+    clock.now += 59
+    assert index.get("gym") == "link-1"
+    clock.now += 2
+    assert index.get("gym") is None
+    assert index.stats()["hits"] == 1
+    assert index.stats()["misses"] == 1
+
+
+def test_recent_and_repeated_events_are_not_inserted_again(index, clock):
+    submit = Submitter()
+    inserter = DedupInserter(index, submit)
+    index.put(event_fingerprint(dict(GYM, activity="Run")), "link-run")
+    events = [GYM, dict(GYM, activity="Run"), dict(GYM, activity="gym")]
+
+    submit.submitted.clear()
+    with ThreadPoolExecutor(1) as pool:
+        result = pool.submit(inserter.insert_many, events, ["gym", "run", "gym again"])
+        submit.submitted.wait(5)
+        submit.futures[0].set_result("link-gym")
+        links, duplicates = result.result(5)
+
+    assert submit.bodies == ["gym"]
+    assert links == ["link-gym", "link-run", "link-gym"]
+    assert duplicates == [False, True, True]
+    assert index.get(event_fingerprint(GYM)) == "link-gym"
+
+
+def test_a_duplicate_waits_for_the_insert_in_flight(index, clock):
+    submit = Submitter()
+    inserter = DedupInserter(index, submit)
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(inserter.insert_many, [GYM], ["gym"])
+        assert submit.submitted.wait(5)
+        # The first insert has not finished, so the index alone would let this one through
+        second = pool.submit(inserter.insert_many, [GYM], ["gym"])
+        with pytest.raises(TimeoutError):
+            second.result(0.1)
+        submit.futures[0].set_result("link-gym")
+
+        assert first.result(5) == (["link-gym"], [False])
+        assert second.result(5) == (["link-gym"], [True])
+    assert submit.bodies == ["gym"]
+
+
+def test_a_failed_insert_is_tried_again_by_the_next_request(index, clock):
+    submit = Submitter()
+    inserter = DedupInserter(index, submit)
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(inserter.insert_many, [GYM], ["gym"])
+        assert submit.submitted.wait(5)
+        second = pool.submit(inserter.insert_many, [GYM], ["gym"])
+        with pytest.raises(TimeoutError):
+            second.result(0.1)
+        submit.futures[0].set_exception(RuntimeError("rate limited"))
+
+        for waiter in (first, second):
+            with pytest.raises(RuntimeError):
+                waiter.result(5)
+
+        submit.submitted.clear()
+        third = pool.submit(inserter.insert_many, [GYM], ["gym"])
+        assert submit.submitted.wait(5)
+        submit.futures[1].set_result("link-gym")
+        assert third.result(5) == (["link-gym"], [False])
+    assert submit.bodies == ["gym", "gym"]
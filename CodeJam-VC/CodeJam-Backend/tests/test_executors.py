@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from executors import BoundedExecutor, ExecutorSaturated
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_runs_on_a_worker_thread_with_the_callers_context():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+
+    async def main():
+        request_id.set("abc")
+        return await executor.run(lambda: (threading.current_thread().name, request_id.get()))
+
+    try:
+        thread_name, seen = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert thread_name.startswith("test")
+    assert seen == "abc"
+
+
+def test_saturated_executor_rejects_right_away():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(release.wait)
+        release.set()
+        return await asyncio.gather(*running)
+
+    try:
+        assert asyncio.run(main()) == [True, True]
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_call_finishes():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_call():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async def main():
+        task = asyncio.ensure_future(executor.run(blocking_call))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The worker thread is still inside blocking_call, so there is no room for another call
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+
+        release.set()
+        for _ in range(100):
+            try:
+                return await executor.run(lambda: "next")
+            except ExecutorSaturated:
+                await asyncio.sleep(0.01)
+
+    try:
+        assert asyncio.run(main()) == "next"
+    finally:
+        release.set()
+        executor.shutdown()
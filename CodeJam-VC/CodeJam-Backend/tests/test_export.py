@@ -0,0 +1,49 @@
+import io
+
+from export import ics_event_lines, write_ics
+from main import Event
+
+
+def event(start_hour, end_hour, day=17):
+    return Event(activity="Study", start_year=2026, start_month=10, start_day=day, start_hour=start_hour,
+                 start_minute=0, end_year=2026, end_month=10, end_day=day, end_hour=end_hour, end_minute=0)
+
+
+def times(lines):
+    return [line for line in lines if line.startswith(("DTSTART", "DTEND", "DURATION"))]
+
+
+def test_event_ends_at_its_end_time():
+    assert times(ics_event_lines(event(9, 10), "20261017T000000Z")) == [
+        "DTSTART;TZID=America/Toronto:20261017T090000",
+        "DTEND;TZID=America/Toronto:20261017T100000",
+    ]
+
+
+def test_event_ending_at_midnight_ends_on_the_next_day():
+    # "study at 11 PM": the parser ends it at 00:00 on the start's date
+    assert times(ics_event_lines(event(23, 0), "20261017T000000Z")) == [
+        "DTSTART;TZID=America/Toronto:20261017T230000",
+        "DTEND;TZID=America/Toronto:20261018T000000",
+    ]
+
+
+def test_range_past_midnight_ends_on_the_next_day():
+    lines = ics_event_lines(event(22, 1, day=31), "20261017T000000Z")
+    assert "DTEND;TZID=America/Toronto:20261101T010000" in lines
+
+
+def test_event_without_a_real_end_lasts_an_hour():
+    assert times(ics_event_lines(event(9, 9), "20261017T000000Z"))[1] == "DURATION:PT1H"
+    no_end = Event(activity="Study", start_year=2026, start_month=10, start_day=17, start_hour=9, start_minute=0)
+    assert times(ics_event_lines(no_end, "20261017T000000Z"))[1] == "DURATION:PT1H"
+
+
+def test_write_ics_uses_crlf_and_skips_events_without_a_start():
+    output = io.StringIO(newline="")
+    assert write_ics([event(23, 0), Event(activity="Someday")], output) == 1
+    text = output.getvalue()
+    assert text.startswith("BEGIN:VCALENDAR\r\n")
+    assert text.endswith("END:VCALENDAR\r\n")
+    assert text.count("BEGIN:VEVENT") == 1
+    assert "DTEND;TZID=America/Toronto:20261018T000000\r\n" in text
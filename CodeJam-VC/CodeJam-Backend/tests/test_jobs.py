@@ -0,0 +1,62 @@
+import asyncio
+
+from jobs import JobRunner, MemoryJobStore
+
+
+class FlakyJobStore(MemoryJobStore):
+    """MemoryJobStore whose next() and status updates raise ConnectionError the first times"""
+
+    def __init__(self, next_failures=0, update_failures=None):
+        super().__init__()
+        self.next_failures = next_failures
+        self.update_failures = dict(update_failures or {})
+
+    async def next(self):
+        if self.next_failures:
+            self.next_failures -= 1
+            raise ConnectionError("store unavailable")
+        return await super().next()
+
+    async def update(self, job_id, **fields):
+        if self.update_failures.get(fields["status"]):
+            self.update_failures[fields["status"]] -= 1
+            raise ConnectionError("store unavailable")
+        await super().update(job_id, **fields)
+
+
+async def upload_size(upload):
+    return len(await upload.read())
+
+
+async def run_job(store, handler=upload_size):
+    runner = JobRunner(store, handler, workers=1, store_retry_after=0.01)
+    runner.start()
+    try:
+        job = await store.submit("clip.wav", b"audio")
+        for _ in range(200):
+            job = await store.get(job["id"])
+            if job["status"] in ("done", "failed"):
+                break
+            await asyncio.sleep(0.01)
+        return job, runner
+    finally:
+        await runner.stop()
+
+
+def test_worker_keeps_running_after_store_errors():
+    job, runner = asyncio.run(run_job(FlakyJobStore(next_failures=3)))
+    assert job["status"] == "done"
+    assert job["result"] == 5
+    assert all(task.cancelled() for task in runner._tasks)
+
+
+def test_a_taken_job_is_marked_failed_when_it_cannot_start():
+    job, _ = asyncio.run(run_job(FlakyJobStore(update_failures={"running": 1})))
+    assert job["status"] == "failed"
+    assert job["error"] == "store unavailable"
+
+
+def test_the_outcome_is_recorded_after_a_store_error():
+    job, _ = asyncio.run(run_job(FlakyJobStore(update_failures={"done": 2})))
+    assert job["status"] == "done"
+    assert job["result"] == 5
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import parse_cache
+from main import parse_schedule_to_events, reference_date_key
+from parse_cache import ParseCache
+
+MORNING = datetime(2026, 10, 17, 9, 15, 30)
+
+
+def starts(events):
+    return [event.start for event in events]
+
+
+class Clock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(parse_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_dated_sentences_are_keyed_by_day():
+    key = reference_date_key("gym tomorrow at 7", MORNING)
+    assert reference_date_key("gym tomorrow at 7", MORNING.replace(hour=22)) == key
+    assert reference_date_key("gym tomorrow at 7", MORNING + timedelta(days=1)) != key
+
+
+def test_relative_times_are_keyed_by_minute():
+    key = reference_date_key("call mom in 2 hours", MORNING)
+    assert reference_date_key("call mom in 2 hours", MORNING.replace(second=59)) == key
+    assert reference_date_key("call mom in 2 hours", MORNING + timedelta(minutes=1)) != key
+
+
+def test_midnight_has_its_own_key():
+    # A date falling on the reference day is this year at midnight and next year once the day has started
+    cache = ParseCache()
+    midnight = datetime(2026, 10, 17)
+    at_midnight = cache.parse("dentist on october 17 at 10 am", midnight)
+    just_after = cache.parse("dentist on october 17 at 10 am", midnight.replace(second=1))
+    assert {start.year for start in starts(at_midnight)} == {2026}
+    assert {start.year for start in starts(just_after)} == {2027}
+    assert cache.stats()["misses"] == 2
+
+
+def test_today_and_tomorrow_move_with_the_date():
+    cache = ParseCache()
+    today = cache.parse("gym today at 7 pm", MORNING)
+    late = cache.parse("gym today at 7 pm", MORNING.replace(hour=23))
+    assert starts(late) == starts(today) == [datetime(2026, 10, 17, 19)]
+    assert cache.stats()["hits"] == 1
+
+    # Just past midnight "today" and "tomorrow" are a day later, so the cached parse is not reused
+    after_midnight = datetime(2026, 10, 18, 0, 0, 30)
+    assert starts(cache.parse("gym today at 7 pm", after_midnight)) == [datetime(2026, 10, 18, 19)]
+    assert starts(cache.parse("gym tomorrow at 7 pm", after_midnight)) == [datetime(2026, 10, 19, 19)]
+    assert cache.stats()["misses"] == 3
+
+
+def test_relative_times_follow_the_minute():
+    cache = ParseCache()
+    first = cache.parse("call mom in 2 hours", MORNING)
+    assert starts(cache.parse("call mom in 2 hours", MORNING.replace(second=59))) == starts(first)
+    later = cache.parse("call mom in 2 hours", MORNING + timedelta(minutes=1))
+    assert [start - timedelta(minutes=1) for start in starts(later)] == starts(first)
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("sentence", ["gym tomorrow at 7", "call mom in 2 hours", "meeting on october 17 at 3 pm",
+                                      "dentist monday at 10 am", "standup at 9.30"])
+def test_cached_parses_match_fresh_ones(sentence):
+    cache = ParseCache()
+    references = [datetime(2026, 10, 16, 23, 59, 59), datetime(2026, 10, 17), datetime(2026, 10, 17, 0, 0, 1),
+                  MORNING, MORNING.replace(second=0), datetime(2026, 10, 17, 23, 59)]
+    for reference in references * 2:
+        expected = parse_schedule_to_events(sentence, reference)
+        assert [event.to_dict() for event in cache.parse(sentence, reference)] == \
+            [event.to_dict() for event in expected]
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ParseCache(ttl=60)
+    cache.parse("gym tomorrow at 7", MORNING)
+    clock.now += 59
+    cache.parse("gym tomorrow at 7", MORNING)
+    clock.now += 2
+    cache.parse("gym tomorrow at 7", MORNING)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_no_ttl_keeps_entries(clock):
+    cache = ParseCache(ttl=0)
+    cache.parse("gym tomorrow at 7", MORNING)
+    clock.now += 10 ** 6
+    cache.parse("gym tomorrow at 7", MORNING)
+    assert cache.stats()["hits"] == 1
+
+
+def test_hits_return_copies():
+    cache = ParseCache()
+    cache.parse(" Gym  tomorrow at 7", MORNING)[0].activity = "changed"
+    assert cache.parse("gym tomorrow at 7", MORNING)[0].activity != "changed"
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ParseCache(maxsize=2)
+    for sentence in ("gym at 7", "run at 8", "gym at 7", "swim at 9", "run at 8"):
+        cache.parse(sentence, MORNING)
+    assert cache.stats()["evictions"] == 2
+    assert cache.stats()["hits"] == 1
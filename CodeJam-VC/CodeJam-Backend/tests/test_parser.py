@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+import bench_parser
+from main import parse_schedule_to_events, split_clauses
+
+REFERENCE_DATE = datetime(2025, 11, 16, 10, 30)
+
+
+def start_hours(sentence):
+    return [event.start.hour for event in parse_schedule_to_events(sentence, REFERENCE_DATE)]
+
+
+@pytest.mark.parametrize("sentence, hours", [
+    ("at 9 in the morning and at 3 in the afternoon", [9, 15]),
+    ("call at 10 this morning and at 4 this afternoon", [10, 16]),
+    ("gym at 7 in the evening", [19]),
+    ("this morning at 9", [9]),
+    # Another time stands between "this morning" and 3
+    ("this morning at 9 and at 3", [9, 3]),
+    ("at 8 pm this morning", [20]),
+    ("at midnight", [0]),
+])
+def test_period_selection(sentence, hours):
+    assert start_hours(sentence) == hours
+
+
+@pytest.mark.parametrize("sentence, clauses", [
+    ("gym at 7 then.", ["gym at 7"]),
+    ("dinner at 8 and then?", ["dinner at 8"]),
+    ("gym at 7 then dinner at 8!", ["gym at 7", "dinner at 8"]),
+    ("standup at 9; lunch at 12", ["standup at 9", "lunch at 12"]),
+    ("gym at 7", ["gym at 7"]),
+])
+def test_split_clauses(sentence, clauses):
+    assert split_clauses(sentence) == clauses
+
+
+@pytest.mark.parametrize("sentence", ["gym at 7 then.", "dinner at 8 and then?"])
+def test_trailing_separator_adds_no_event(sentence):
+    assert len(parse_schedule_to_events(sentence, REFERENCE_DATE)) == 1
+
+
+def test_invalid_datetime_is_dropped():
+    # The 24 of "24 november" is also read as a time, and hour 24 is not a clock time
+    events = parse_schedule_to_events("meeting 24 november at 3 pm", REFERENCE_DATE)
+    assert [(event.start.day, event.start.hour) for event in events] == [(24, 15)]
+    assert parse_schedule_to_events("meeting 24 november", REFERENCE_DATE) == []
+
+
+def test_locations_follow_their_time_mention():
+    events = parse_schedule_to_events("meeting at the library 24 november at 3 and at 5 at the park", REFERENCE_DATE)
+    assert [(event.start.hour, event.location) for event in events] == [(3, "the library"), (5, "the park")]
+
+
+def test_golden_corpus():
+    # Same check as `python bench_parser.py --skip-bench`; regenerate with --update-golden after a deliberate change
+    assert bench_parser.check_golden(bench_parser.generate_corpus()) == 0
@@ -0,0 +1,54 @@
+import json
+
+from transcript_cache import TranscriptCache
+
+
+def result(text):
+    return {"text": text, "segments": [], "language": "en"}
+
+
+def size(text):
+    return len(json.dumps(result(text)).encode("utf-8"))
+
+
+def test_put_and_get(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("abc", "small.en", result("gym at 7"))
+
+    assert cache.get("abc", "small.en") == result("gym at 7")
+    assert cache.get("abc", "base.en") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    cache.close()
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache.sqlite3"), max_bytes=size("aaaa") * 2)
+    cache.put("a", "m", result("aaaa"))
+    cache.put("b", "m", result("bbbb"))
+    cache.get("a", "m")
+    cache.put("c", "m", result("cccc"))
+
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") == result("aaaa")
+    assert cache.get("c", "m") == result("cccc")
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_byte_total_follows_replacements_evictions_and_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranscriptCache(path, max_bytes=size("aaaa") * 2)
+    cache.put("a", "m", result("aaaa"))
+    cache.put("a", "m", result("aa"))
+    assert cache.stats()["bytes"] == size("aa")
+
+    cache.put("b", "m", result("bbbb"))
+    cache.put("c", "m", result("cccc"))
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, size("bbbb") + size("cccc"))
+    cache.close()
+
+    reopened = TranscriptCache(path, max_bytes=size("aaaa") * 2)
+    assert reopened.stats()["bytes"] == size("bbbb") + size("cccc")
+    reopened.close()
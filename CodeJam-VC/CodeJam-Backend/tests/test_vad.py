@@ -0,0 +1,62 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vad import SAMPLE_RATE, trim_silence
+
+
+def tone(seconds, level_db=-20.0):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (10 ** (level_db / 20) * np.sqrt(2) * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def agc_speech(seconds, spread_db=12.0, seed=0):
+    """A continuous signal whose level wanders by spread_db every 100 ms, like a mic with automatic gain"""
+    rng = np.random.default_rng(seed)
+    audio = tone(seconds)
+    steps = rng.uniform(-spread_db, 0, size=int(np.ceil(seconds * 10)))
+    gain = 10 ** (np.repeat(steps, SAMPLE_RATE // 10)[:len(audio)] / 20)
+    return (audio * gain).astype(np.float32)
+
+
+@pytest.mark.parametrize("seconds", [1.5, 4.0])
+@pytest.mark.parametrize("spread_db", [6.0, 12.0])
+def test_clip_without_silence_is_kept_whole(seconds, spread_db):
+    audio = agc_speech(seconds, spread_db)
+
+    trimmed, report = trim_silence(audio)
+
+    assert len(trimmed) == len(audio)
+    assert report["speech_seconds"] == seconds
+    assert report["trimmed_seconds"] == 0.0
+
+
+def test_leading_and_trailing_silence_is_trimmed():
+    silence = np.zeros(SAMPLE_RATE * 2, dtype=np.float32)
+    audio = np.concatenate([silence, agc_speech(1.5), silence])
+
+    trimmed, report = trim_silence(audio, padding_ms=210)
+
+    # 1.5 s of speech plus 7 frames of 30 ms padding on either side, give or take the frames it straddles
+    assert report["speech_seconds"] == pytest.approx(1.5 + 2 * 0.21, abs=0.06)
+    assert report["trimmed_seconds"] == pytest.approx(5.5 - report["speech_seconds"], abs=0.001)
+    assert np.abs(trimmed).max() > 0.01
+
+
+def test_quiet_recording_comes_back_empty():
+    audio = tone(2.0, level_db=-70.0)
+
+    trimmed, report = trim_silence(audio)
+
+    assert len(trimmed) == 0
+    assert report["speech_seconds"] == 0.0
+
+
+def test_long_padding_does_not_overflow():
+    silence = np.zeros(SAMPLE_RATE * 6, dtype=np.float32)
+    audio = np.concatenate([silence, tone(0.3), silence])
+
+    # 5 s of padding at 30 ms frames is a 335-frame kernel
+    trimmed, report = trim_silence(audio, padding_ms=5000, max_pause_ms=500)
+
+    assert report["speech_seconds"] == pytest.approx(0.3 + 2 * 5.01, abs=0.06)
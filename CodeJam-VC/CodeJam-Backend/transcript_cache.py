@@ -0,0 +1,108 @@
+"""
+Content-addressed cache of Whisper transcriptions, stored in a local SQLite file.
+
+Results are keyed by the SHA-256 of the uploaded bytes plus the model name, so an upload
+retried on a flaky network is answered without running Whisper again. The store is kept
+under max_bytes by dropping the least recently used results.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+async def upload_digest(upload, chunk_size=64 * 1024):
+    """SHA-256 hex digest of an UploadFile's bytes; rewinds the file afterwards so it can be decoded"""
+    digest = hashlib.sha256()
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    await upload.seek(0)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS transcripts_last_used ON transcripts (last_used)")
+        # Running total of the stored sizes, so puts never sum the whole table
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+
+    @staticmethod
+    def key(digest, model_name):
+        return f"{model_name}:{digest}"
+
+    def get(self, digest, model_name):
+        """The cached Whisper result for these bytes and model, or None"""
+        key = self.key(digest, model_name)
+        with self._lock:
+            row = self._db.execute("SELECT result FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE transcripts SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, digest, model_name, result):
+        """Store a Whisper result, then evict least recently used results until under max_bytes"""
+        payload = json.dumps(result)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        key = self.key(digest, model_name)
+        with self._lock:
+            replaced = self._db.execute("SELECT size FROM transcripts WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO transcripts (key, result, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time())
+            )
+            self._bytes += size - (replaced[0] if replaced else 0)
+            self._evict()
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        # Walk from the least recently used row only as far as needed
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM transcripts ORDER BY last_used"):
+            if self._bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            self._bytes -= size
+        self._db.executemany("DELETE FROM transcripts WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+            total = self._bytes
+        return {
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,67 @@
+"""
+Interchangeable speech-to-text engines behind one transcribe() interface.
+
+Every backend takes a 16 kHz float32 waveform and returns a Whisper-style result dict:
+    {"text": ..., "segments": [{"start": ..., "end": ..., "text": ...}, ...], "language": ...}
+which is all /upload, /stream and the transcript cache rely on.
+
+    whisper         openai-whisper in PyTorch (the default, fp32 on CPU)
+    faster-whisper  the same Whisper weights on CTranslate2, int8 on CPU by default;
+                    needs the optional faster-whisper package
+
+load_backend(name, model_name) builds one replica; ModelPool calls it for each replica.
+"""
+
+
+class WhisperBackend:
+    name = "whisper"
+
+    def __init__(self, model_name):
+        import whisper
+
+        self.model = whisper.load_model(model_name)
+        self.fp16 = self.model.device.type == "cuda"
+
+    def transcribe(self, audio, **kwargs):
+        kwargs.setdefault("fp16", self.fp16)
+        return self.model.transcribe(audio, **kwargs)
+
+
+class FasterWhisperBackend:
+    name = "faster-whisper"
+
+    def __init__(self, model_name, compute_type="int8", cpu_threads=0):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("The faster-whisper backend needs the faster-whisper package: "
+                               "pip install faster-whisper") from None
+
+        self.model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+        self.language = "en" if model_name.endswith(".en") else None
+
+    def transcribe(self, audio, **kwargs):
+        kwargs.setdefault("language", self.language)
+        # Segments are produced lazily; listing them runs the decode
+        segments, info = self.model.transcribe(audio, **kwargs)
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def load_backend(name, model_name, **options):
+    """Load one replica of the named backend; options go to its constructor"""
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend {name!r}; choose from {', '.join(BACKENDS)}") from None
+    return backend(model_name, **options)
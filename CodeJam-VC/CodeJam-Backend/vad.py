@@ -0,0 +1,95 @@
+"""
+Voice-activity trimming before Whisper inference.
+
+Recordings from the mic page often carry seconds of silence before and after the speech,
+plus long pauses in between, and Whisper's cost grows with every second it is given.
+trim_silence() finds the speech frames, keeps a little padding around them, drops the
+leading and trailing silence and shortens long pauses, then reports how much was removed.
+
+Speech frames are found by frame energy against an adaptive noise floor by default, or by
+the WebRTC VAD when mode="webrtc" (needs the optional webrtcvad package).
+"""
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def _energy_speech_frames(frames, threshold_db, margin_db):
+    """
+    Frames louder than both an absolute floor and the recording's own noise floor plus a margin.
+
+    The noise floor is the 10th percentile of frame energy, which only measures noise when the
+    recording has some silence. Levels spanning less than twice the margin, as in a clip that is
+    speech from end to end, have none, so only the absolute floor applies then; it also applies
+    when no frame clears the relative one.
+    """
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-12)
+    energy_db = 20 * np.log10(rms)
+    loud = energy_db > threshold_db
+    noise_floor_db, peak_db = np.percentile(energy_db, [10, 90])
+    if peak_db - noise_floor_db < 2 * margin_db:
+        return loud
+    speech = loud & (energy_db > noise_floor_db + margin_db)
+    return speech if speech.any() else loud
+
+
+def _webrtc_speech_frames(frames, aggressiveness):
+    try:
+        import webrtcvad
+    except ImportError:
+        raise RuntimeError("VAD mode 'webrtc' needs the webrtcvad package: pip install webrtcvad") from None
+    vad = webrtcvad.Vad(aggressiveness)
+    pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype(np.int16)
+    return np.array([vad.is_speech(frame.tobytes(), SAMPLE_RATE) for frame in pcm], dtype=bool)
+
+
+def trim_silence(audio, mode="energy", frame_ms=30, threshold_db=-45.0, margin_db=10.0, aggressiveness=2,
+                 padding_ms=200, max_pause_ms=500):
+    """
+    Remove silence from a 16 kHz float32 waveform.
+
+    Returns (trimmed_audio, report), where report holds original_seconds, speech_seconds and
+    trimmed_seconds. Speech keeps padding_ms of context on both sides; pauses longer than
+    max_pause_ms are shortened to max_pause_ms so words do not run together. A recording with
+    no speech at all comes back empty.
+    """
+    frame_length = SAMPLE_RATE * frame_ms // 1000
+    frame_count = len(audio) // frame_length
+    original_seconds = len(audio) / SAMPLE_RATE
+
+    if frame_count == 0:
+        return audio, {"original_seconds": original_seconds, "speech_seconds": original_seconds,
+                       "trimmed_seconds": 0.0}
+
+    frames = audio[:frame_count * frame_length].reshape(frame_count, frame_length)
+    if mode == "webrtc":
+        speech = _webrtc_speech_frames(frames, aggressiveness)
+    else:
+        speech = _energy_speech_frames(frames, threshold_db, margin_db)
+
+    # Widen every speech region by the padding, so word onsets and tails survive
+    padding = int(np.ceil(padding_ms / frame_ms))
+    if padding and speech.any():
+        # int32 counts, so kernels longer than 127 frames cannot overflow
+        speech = np.convolve(speech.astype(np.int32), np.ones(2 * padding + 1, dtype=np.int32), mode="same") > 0
+
+    # Keep speech frames, plus up to max_pause frames of every pause between them
+    keep = speech.copy()
+    max_pause = int(max_pause_ms // frame_ms)
+    speech_indices = np.flatnonzero(speech)
+    for previous, current in zip(speech_indices[:-1], speech_indices[1:]):
+        gap = current - previous - 1
+        if gap > 0:
+            keep[previous + 1:previous + 1 + min(gap, max_pause)] = True
+
+    kept = frames[keep].reshape(-1)
+    # Whatever is past the last whole frame belongs to the trailing audio; keep it if the end was kept
+    if keep[-1]:
+        kept = np.concatenate([kept, audio[frame_count * frame_length:]])
+
+    speech_seconds = len(kept) / SAMPLE_RATE
+    return kept, {
+        "original_seconds": round(original_seconds, 3),
+        "speech_seconds": round(speech_seconds, 3),
+        "trimmed_seconds": round(original_seconds - speech_seconds, 3),
+    }
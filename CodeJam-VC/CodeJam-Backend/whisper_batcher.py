@@ -0,0 +1,147 @@
+"""
+Cross-request micro-batching for Whisper inference.
+
+A WhisperBatcher collects clips from concurrent requests for up to `window` seconds or until
+max_batch clips are waiting, pads each to Whisper's 30 second window, stacks their log-mel
+spectrograms into one tensor and decodes them together with whisper.decode(). Each waiting
+request gets its own text back.
+
+whisper.decode() sees one 30 second window and does no temperature fallback, so clips longer
+than that go through model.transcribe on their own, exactly as before. Batched results carry
+no segment timestamps; /upload only needs the text.
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+import whisper
+
+from executors import ExecutorSaturated
+from metrics import span
+
+
+class _PendingClip:
+    __slots__ = ('audio', 'future')
+
+    def __init__(self, audio):
+        self.audio = audio
+        self.future = Future()
+
+
+def decode_batch(model, clips, language=None):
+    """Decode up to 30 seconds of each clip in one batched forward pass; returns one text per clip"""
+    mels = [whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), n_mels=model.dims.n_mels) for clip in clips]
+    batch = torch.stack(mels).to(model.device)
+    options = whisper.DecodingOptions(language=language, without_timestamps=True,
+                                      fp16=model.device.type == "cuda")
+    return [result.text.strip() for result in whisper.decode(model, batch, options)]
+
+
+class WhisperBatcher:
+    def __init__(self, model_pool, window=0.01, max_batch=8, max_queue=32):
+        """
+        window:    seconds to wait for more clips once one is waiting
+        max_batch: most clips decoded together
+        max_queue: most clips waiting before submit() raises ExecutorSaturated
+        """
+        if model_pool.backend != "whisper":
+            raise ValueError(f"Batched decoding needs the whisper backend, not {model_pool.backend!r}")
+        self.model_pool = model_pool
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.max_queue = max_queue
+        # English-only models have no language token to detect
+        self.language = "en" if model_pool.model_name.endswith(".en") else None
+        self.batches = 0
+        self.clips = 0
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        # One scheduler thread per replica, so every replica can be decoding a batch at once
+        self._threads = [threading.Thread(target=self._run, name=f"whisper-batcher-{i}", daemon=True)
+                         for i in range(model_pool.replicas)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, audio):
+        """Queue one 16 kHz float32 clip; the returned Future resolves to a Whisper-style result dict"""
+        item = _PendingClip(audio)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("WhisperBatcher is closed")
+            if len(self._pending) >= self.max_queue:
+                raise ExecutorSaturated("whisper batcher is saturated")
+            self._pending.append(item)
+            self._condition.notify()
+        return item.future
+
+    def close(self):
+        """Decode whatever is still queued, then stop the scheduler threads"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _next_batch(self):
+        """Block until clips are waiting, give others a moment to join, and take up to max_batch"""
+        with self._condition:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._condition.wait()
+
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._decode(batch)
+
+    def _decode(self, batch):
+        long_clips = [item for item in batch if len(item.audio) > whisper.audio.N_SAMPLES]
+        short_clips = [item for item in batch if len(item.audio) <= whisper.audio.N_SAMPLES]
+
+        # Batched decoding needs the PyTorch model, so the pool must use the whisper backend
+        with self.model_pool.acquire() as backend:
+            if short_clips:
+                try:
+                    with span("whisper.batch"):
+                        texts = decode_batch(backend.model, [np.asarray(item.audio, dtype=np.float32) for item in short_clips],
+                                             language=self.language)
+                    with self._condition:
+                        self.batches += 1
+                        self.clips += len(short_clips)
+                    for item, text in zip(short_clips, texts):
+                        item.future.set_result({"text": text, "segments": [], "language": self.language})
+                except Exception as exc:
+                    for item in short_clips:
+                        item.future.set_exception(exc)
+
+            for item in long_clips:
+                try:
+                    with span("whisper.inference"):
+                        result = backend.transcribe(item.audio)
+                    item.future.set_result(result)
+                except Exception as exc:
+                    item.future.set_exception(exc)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "clips": self.clips,
+            "mean_batch_size": self.clips / self.batches if self.batches else 0.0,
+        }